@@ -0,0 +1,71 @@
+"""Fixtures shared by the test modules.
+
+The *tba* fixture runs a local HTTP server that stands in for the TBA
+Read API. Tests register its responses with add_response().
+"""
+import gzip
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+import tbap.api as api
+
+
+class FakeTBAHandler(http.server.BaseHTTPRequestHandler):
+    """Serves canned JSON responses over HTTP/1.1 keep-alive."""
+    protocol_version = "HTTP/1.1"
+    canned = {}
+    requests = []
+    delay = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        FakeTBAHandler.requests.append((self.path, dict(self.headers)))
+        canned = FakeTBAHandler.canned.get(self.path, (404, {}, b""))
+        if isinstance(canned, list):
+            # A list of replies is served in order; the last one repeats.
+            canned = canned.pop(0) if len(canned) > 1 else canned[0]
+        code, headers, body = canned
+        time.sleep(FakeTBAHandler.delay)
+        self.send_response(code)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def tba():
+    FakeTBAHandler.canned = {}
+    FakeTBAHandler.requests = []
+    FakeTBAHandler.delay = 0
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeTBAHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    FakeTBAHandler.url = "http://127.0.0.1:{}/api/v3".format(
+        httpd.server_port)
+    yield local_session(api.Session, FakeTBAHandler.url), FakeTBAHandler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def local_session(session_class, url):
+    return type("Local" + session_class.__name__, (session_class,),
+                {"TBA_URL": url})
+
+
+def add_response(handler, path, jdata, code=200, headers=None):
+    body = json.dumps(jdata).encode("utf-8") if code != 304 else b""
+    hdrs = {"Content-Type": "application/json",
+            "Last-Modified": "Wed, 30 Aug 2017 06:49:32 GMT"}
+    hdrs.update(headers or {})
+    if hdrs.get("Content-Encoding") == "gzip":
+        body = gzip.compress(body)
+    handler.canned["/api/v3/" + path] = (code, hdrs, body)
@@ -0,0 +1,217 @@
+import copy
+import json
+import os.path
+
+import pandas
+import pytz
+
+import tbap.dframe as dframe
+import tbap.server as server
+
+JSON_DIR = os.path.join(os.path.dirname(__file__), "..", "JSON")
+
+
+def load_json(filename):
+    with open(os.path.join(JSON_DIR, filename)) as file:
+        return json.load(file)
+
+
+def normalize(jdata):
+    """Flattens JSON objects the way build_table() previously did."""
+    df = pandas.json_normalize(jdata)
+    dict_cols = [key for key, val in jdata[0].items() if isinstance(val, dict)]
+    return df.drop([col for col in dict_cols if col in df.columns], axis=1)
+
+
+class TestMatchTable(object):
+
+    def test_event_matches(self):
+        jdata = load_json("tba_matches_event_2017tur.json")
+        df = dframe.build_match_table(jdata)
+        nrows = sum(len(mtch["alliances"][alli][teams]) for mtch in jdata
+                    for alli in ["blue", "red"]
+                    for teams in ["team_keys", "surrogate_team_keys"])
+        assert df.shape[0] == nrows
+        assert list(df.columns[:6]) == ["team_key", "alliance", "surrogate",
+                                        "score", "disqualified", "actual_time"]
+        assert "score_breakdown" not in df.columns
+
+        final = df[df["key"] == "2017tur_f1m1"].set_index("team_key")
+        assert list(final.index) == ["frc2046", "frc1318", "frc1595",
+                                     "frc1296", "frc2473", "frc1323"]
+        assert final.loc["frc1318", "score"] == 503
+        assert final.loc["frc1318", "autoPoints"] == 82
+        assert final.loc["frc1296", "alliance"] == "red"
+        assert final.loc["frc1296", "score"] == 271
+
+    def test_missing_values(self):
+        jdata = load_json("tba_matches_event_2017tur.json")[:2]
+        jdata[0]["score_breakdown"] = None
+        alliance = jdata[1]["alliances"]["red"]
+        alliance["surrogate_team_keys"] = [alliance["team_keys"][0]]
+        alliance["dq_team_keys"] = [alliance["team_keys"][1]]
+        df = dframe.build_match_table(jdata)
+        assert df.shape[0] == 13
+        assert df["autoPoints"][:6].isnull().all()
+        assert df["autoPoints"][6:].notnull().all()
+        red = df[(df["key"] == jdata[1]["key"]) & (df["alliance"] == "red")]
+        assert list(red["surrogate"]) == [False, False, False, True]
+        assert list(red["disqualified"]) == [False, True, False, False]
+
+    def test_empty(self):
+        assert dframe.build_match_table([]).equals(pandas.DataFrame())
+
+
+class TestSingleColumn(object):
+
+    def test_nested(self):
+        jdata = {"qual": {"num teams": 40, "ranking": {"rank": 3},
+                          "sort orders": [2.0, 54]},
+                 "playoff": None, "alliance": {}, "picks": [],
+                 "status string": "Rank 3"}
+        df = dframe.build_single_column(jdata)
+        assert df.index.name == "label"
+        assert list(df.index) == ["qual_num_teams", "qual_ranking_rank",
+                                  "qual_sort_orders_0", "qual_sort_orders_1",
+                                  "playoff", "alliance", "picks",
+                                  "status_string"]
+        assert list(df["value"][:4]) == [40, 3, 2.0, 54]
+        assert df["value"][4:7].isnull().all()
+
+        series = dframe.build_single_column(json.dumps(jdata), series=True)
+        assert list(series.index) == list(df.index)
+        assert series["status_string"] == "Rank 3"
+
+    def test_status(self):
+        jdata = load_json("tba_status.json")
+        series = dframe.build_single_column(jdata, series=True)
+        assert series["ios_min_app_version"] == jdata["ios"]["min_app_version"]
+        assert len(series) == 10
+
+
+class TestBuildTable(object):
+
+    def test_alliances(self):
+        jdata = load_json("tba_alliances.json")
+        df = dframe.build_table(jdata)
+        expected = normalize(jdata)
+        # Only the third alliance has a backup team, so json_normalize()
+        #   also returns a "backup" column of nulls.
+        assert set(expected.columns) - set(df.columns) == {"backup"}
+        pandas.testing.assert_frame_equal(df, expected[df.columns])
+        assert df.loc[2, "backup.in"] == "frc4513"
+
+    def test_heterogeneous(self):
+        jdata = [{"key": "frc1", "home": None, "loc": {"lat": 1.0}},
+                 {"key": "frc2", "home": {"2017": "Houston"},
+                  "loc": {"lat": 2.0, "lng": 3.0}},
+                 {"key": "frc3", "extra": 5}]
+        df = dframe.build_table(jdata)
+        assert list(df.columns) == ["key", "extra", "home.2017", "loc.lat",
+                                    "loc.lng"]
+        assert df["home.2017"].isnull().tolist() == [True, False, True]
+        assert df["loc.lng"].isnull().tolist() == [True, False, True]
+        assert df["extra"].isnull().tolist() == [True, True, False]
+
+    def test_mixed_types(self):
+        jdata = [{"key": "frc1", "home": "Houston"},
+                 {"key": "frc2", "home": {"2017": "Detroit"}}]
+        df = dframe.build_table(jdata)
+        assert list(df.columns) == ["key", "home", "home.2017"]
+        assert df["home"].tolist()[0] == "Houston"
+        assert df["home.2017"].tolist()[1] == "Detroit"
+        assert df[["home", "home.2017"]].isnull().sum().tolist() == [1, 1]
+
+    def test_same_input_same_frame(self):
+        jdata = load_json("tba_alliances.json")
+        args = ["event", "2017tur", "alliances"]
+        first = dframe.build_table(server.Response(text=json.dumps(jdata),
+                                                   args=args))
+        changed = copy.deepcopy(jdata)
+        changed[1]["name"] = {"short": "A2"}
+        second = dframe.build_table(server.Response(text=json.dumps(changed),
+                                                    args=args))
+        assert second.loc[1, "name.short"] == "A2"
+        assert second["name"].isnull()[1]
+        third = dframe.build_table(server.Response(text=json.dumps(jdata),
+                                                   args=args))
+        assert third.shape == (8, 14)
+        pandas.testing.assert_frame_equal(third, first)
+
+    def test_learned_schema(self):
+        # Each record changes the schema: a None leaf becomes a value,
+        #   then an object; a child gains a key.
+        jdata = [{"key": "frc1", "home": None, "loc": {"lat": 1.0}},
+                 {"key": "frc2", "home": "Houston", "loc": None},
+                 {"key": "frc3", "home": {"2017": "Detroit"},
+                  "loc": {"lat": 2.0, "lng": 3.0}},
+                 {"key": "frc4"}]
+        df = dframe.build_table(jdata)
+        assert list(df.columns) == ["key", "home", "home.2017", "loc.lat",
+                                    "loc.lng"]
+        assert df["home"].tolist()[1] == "Houston"
+        assert df["home.2017"].tolist()[2] == "Detroit"
+        assert df["loc.lng"].tolist()[2] == 3.0
+        assert df.isnull().sum().tolist() == [0, 3, 3, 2, 3]
+        schema = dframe.Schema.from_records(jdata)
+        assert list(df.columns) == schema.columns()
+
+    def test_record_path(self):
+        jdata = load_json("tba_district_rankings.json")
+        df = dframe.build_table(jdata)
+        assert df.shape[0] == sum(len(team["event_points"]) for team in jdata)
+        first = df[df["team_key"] == jdata[0]["team_key"]]
+        assert list(first["event_key"]) == [
+            points["event_key"] for points in jdata[0]["event_points"]]
+        assert (first["point_total"] == jdata[0]["point_total"]).all()
+
+    def test_empty(self):
+        assert dframe.build_table([]).equals(pandas.DataFrame())
+
+
+class TestExpandColumn(object):
+
+    def test_union_of_keys(self):
+        df = pandas.DataFrame({
+            "key": ["2017wasno", "2017nytr", "2017pncmp"],
+            "district": [None, {"abbreviation": "ne", "year": 2017},
+                         {"abbreviation": "pnw", "key": "2017pnw",
+                          "year": 2017}]})
+        result = dframe.expand_column(df, "district", {"year": "Int64"})
+        assert result is df
+        assert list(df.columns) == ["key", "district_abbreviation",
+                                    "district_year", "district_key"]
+        assert str(df["district_year"].dtype) == "Int64"
+        assert df["district_year"].isnull().tolist() == [True, False, False]
+        assert df["district_key"].isnull().tolist() == [True, True, False]
+        assert df.loc[2, "district_key"] == "2017pnw"
+
+    def test_single_dtype(self):
+        df = pandas.DataFrame({"points": [{"a": 1, "b": 2}, {"a": 3}]},
+                              index=["frc1", "frc2"])
+        dframe.expand_column(df, "points", float)
+        assert list(df.dtypes) == ["float64", "float64"]
+        assert df.loc["frc2", "points_a"] == 3.0
+
+    def test_no_objects(self):
+        df = pandas.DataFrame({"key": ["a", "b"], "district": [None, None]})
+        assert list(dframe.expand_column(df, "district").columns) == [
+            "key", "district"]
+        assert dframe.expand_column(df, "missing") is df
+
+
+class TestConvertTimes(object):
+
+    def test_convert(self):
+        jdata = load_json("tba_matches_event_2017tur.json")
+        jdata[0]["post_result_time"] = None
+        df = dframe.build_match_table(jdata)
+        epoch = df["actual_time"].copy()
+        dframe.convert_times(df, pytz.timezone("America/Los_Angeles"))
+        for col in ["actual_time", "post_result_time", "predicted_time",
+                    "time"]:
+            assert str(df[col].dt.tz) == "America/Los_Angeles"
+        assert df["post_result_time"][:6].isnull().all()
+        first = df["actual_time"].iloc[0]
+        assert first.timestamp() == epoch.iloc[0]
+        assert (first.hour, first.utcoffset().total_seconds()) == (10, -25200)
@@ -0,0 +1,97 @@
+import copy
+import time
+
+import pandas
+import pytest
+
+import tbap.live as live
+import tbap.server as server
+from Tests.conftest import add_response
+
+RANKINGS = {"sort_order_info": [{"name": "Ranking Score"}],
+            "extra_stats_info": [],
+            "rankings": [{"rank": 1, "team_key": "frc1318",
+                          "matches_played": 10, "dq": 0,
+                          "record": {"wins": 9, "losses": 1, "ties": 0},
+                          "sort_orders": [3.2], "extra_stats": []}]}
+
+
+class TestPoller(object):
+
+    def test_changes(self, tba):
+        session_class, handler = tba
+        rankings = copy.deepcopy(RANKINGS)
+        add_response(handler, "event/2017pncmp/rankings", rankings)
+        sn = session_class("username", "key")
+        received = []
+        poller = live.Poller(sn, min_interval=10, max_interval=40)
+        watch = poller.watch("2017pncmp", "rankings",
+                             lambda wch, data: received.append(data))
+
+        assert poller.poll_due() == [watch]
+        assert isinstance(received[0], pandas.DataFrame)
+        assert received[0].loc[1, "team"] == "frc1318"
+        assert watch.interval == 10
+        assert poller.poll_due() == []
+
+        add_response(handler, "event/2017pncmp/rankings", {}, code=304)
+        for interval in [15, 22.5, 33.75, 40]:
+            assert not poller.poll(watch)
+            assert watch.interval == interval
+        assert handler.requests[-1][1]["If-Modified-Since"] == \
+            watch.last_modified
+        assert len(received) == 1
+
+        # Same content without a 304 is not a change
+        add_response(handler, "event/2017pncmp/rankings", rankings)
+        assert not poller.poll(watch)
+        rankings["rankings"][0]["matches_played"] = 11
+        add_response(handler, "event/2017pncmp/rankings", rankings)
+        assert poller.poll(watch)
+        assert watch.interval == 20
+        assert received[1].loc[1, "matches_played"] == 11
+        assert watch.changes == 2
+
+    def test_max_age(self, tba):
+        session_class, handler = tba
+        add_response(handler, "event/2017pncmp/oprs",
+                     {"oprs": {"frc1318": 50.0}, "dprs": {"frc1318": 20.0},
+                      "ccwms": {"frc1318": 30.0}},
+                     headers={"Cache-Control": "max-age=120"})
+        sn = session_class("username", "key", data_format="json")
+        received = []
+        poller = live.Poller(sn)
+        watch = poller.watch("2017pncmp", "oprs",
+                             lambda wch, data: received.append(data))
+        poller.poll(watch)
+        assert watch.max_age == 120
+        assert watch.next_poll - time.monotonic() > 100
+        assert isinstance(received[0], server.Response)
+
+    def test_callback_error(self, tba):
+        session_class, handler = tba
+        add_response(handler, "event/2017pncmp/rankings", RANKINGS)
+        add_response(handler, "event/2017pncmp/oprs",
+                     {"oprs": {"frc1318": 50.0}, "dprs": {"frc1318": 20.0},
+                      "ccwms": {"frc1318": 30.0}})
+        sn = session_class("username", "key", data_format="json")
+        received = []
+
+        def fail(wch, data):  # pylint: disable=unused-argument
+            raise ValueError("callback failed")
+
+        poller = live.Poller(sn)
+        failing = poller.watch("2017pncmp", "rankings", fail)
+        watch = poller.watch("2017pncmp", "oprs",
+                             lambda wch, data: received.append(data))
+        with pytest.warns(UserWarning, match="callback failed"):
+            assert poller.poll_due() == [watch]
+        assert len(received) == 1
+        assert failing.polls == 1
+        assert failing.next_poll > time.monotonic()
+
+    def test_bad_resource(self, tba):
+        session_class, _ = tba
+        poller = live.Poller(session_class("username", "key"))
+        with pytest.raises(server.ArgumentError):
+            poller.watch("2017pncmp", "awards", print)
@@ -0,0 +1,171 @@
+import json
+import os.path
+
+import numpy
+import pandas
+import pytest
+
+import tbap.dframe as dframe
+import tbap.opr as opr
+
+JSON_DIR = os.path.join(os.path.dirname(__file__), "..", "JSON")
+
+
+def load_matches():
+    with open(os.path.join(JSON_DIR,
+                           "tba_matches_event_2017tur.json")) as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def matches():
+    return dframe.build_match_table(load_matches()).set_index(["key",
+                                                               "team_key"])
+
+
+def synthetic_matches(strength, num_matches, seed=0):
+    """Builds a match table whose scores are exact sums of *strength*."""
+    rng = numpy.random.RandomState(seed)
+    teams = list(strength)
+    rows = []
+    for num in range(num_matches):
+        picks = rng.choice(len(teams), 6, replace=False)
+        for alliance, idxs in [("blue", picks[:3]), ("red", picks[3:])]:
+            score = sum(strength[teams[idx]] for idx in idxs)
+            for idx in idxs:
+                rows.append({"key": "qm{}".format(num), "team_key": teams[idx],
+                             "alliance": alliance, "surrogate": False,
+                             "comp_level": "qm", "score": score})
+    return pandas.DataFrame(rows).set_index(["key", "team_key"])
+
+
+class TestComputeOprs(object):
+
+    def test_exact(self):
+        rng = numpy.random.RandomState(1)
+        strength = {"frc{}".format(num): rng.uniform(0, 50)
+                    for num in range(30)}
+        result = opr.compute_oprs(synthetic_matches(strength, 80))
+        expected = pandas.Series(strength).sort_index()
+        numpy.testing.assert_allclose(result["oprs"], expected)
+        numpy.testing.assert_allclose(result["ccwms"],
+                                      result["oprs"] - result["dprs"])
+
+    def test_event(self, matches):
+        result = opr.compute_oprs(matches)
+        assert list(result.columns) == ["oprs", "dprs", "ccwms"]
+        assert result.index.name == "team"
+        qual = matches.reset_index()
+        qual = qual[(qual["comp_level"] == "qm") & ~qual["surrogate"]]
+        assert sorted(result.index) == sorted(qual["team_key"].unique())
+
+        incidence, teams, alliances = opr.build_incidence(matches)
+        assert incidence.shape == (len(alliances), len(teams))
+        assert (incidence.sum(axis=1) == 3).all()
+        expected = numpy.linalg.lstsq(incidence, alliances["score"],
+                                      rcond=None)[0]
+        numpy.testing.assert_allclose(result["oprs"], expected)
+
+    def test_unplayed(self, matches):
+        unplayed = matches.copy()
+        qual_keys = unplayed.index.get_level_values("key").str.contains("_qm")
+        unplayed.loc[qual_keys, "score"] = -1
+        assert opr.compute_oprs(unplayed).empty
+
+    def test_singular(self):
+        strength = {"frc{}".format(num): float(num) for num in range(12)}
+        result = opr.compute_oprs(synthetic_matches(strength, 2))
+        assert numpy.isfinite(result.to_numpy()).all()
+
+
+class TestComponentOprs(object):
+
+    def test_batched(self, matches):
+        result = opr.compute_component_oprs(matches)
+        assert "autoPoints" in result.columns
+        assert "match_number" not in result.columns
+        assert "actual_time" not in result.columns
+        numpy.testing.assert_allclose(result["score"],
+                                      opr.compute_oprs(matches)["oprs"])
+        incidence, _, alliances = opr.build_incidence(matches)
+        for col in ["autoPoints", "rotor1Engaged"]:
+            expected = numpy.linalg.lstsq(
+                incidence, alliances[col].astype(float), rcond=None)[0]
+            numpy.testing.assert_allclose(result[col], expected, atol=1e-9)
+
+    def test_missing_values(self, matches):
+        matches = matches.copy()
+        keys = matches.index.get_level_values("key")
+        matches["autoPoints"] = matches["autoPoints"].astype(float)
+        matches.loc[keys.isin(["2017tur_qm1", "2017tur_qm2"]),
+                    "autoPoints"] = None
+        result = opr.compute_component_oprs(matches, ["score", "autoPoints"])
+        assert list(result.columns) == ["score", "autoPoints"]
+        assert numpy.isfinite(result.to_numpy()).all()
+        numpy.testing.assert_allclose(result["score"],
+                                      opr.compute_oprs(matches)["oprs"])
+
+    def test_missing_breakdown(self, monkeypatch):
+        jdata = load_matches()
+        qual = [mtch for mtch in jdata if mtch["comp_level"] == "qm"]
+        qual[0]["score_breakdown"] = None
+        matches = dframe.build_match_table(jdata)
+        full = opr.compute_component_oprs(
+            dframe.build_match_table(load_matches()))
+        calls = []
+        solve = opr.solve
+        monkeypatch.setattr(opr, "solve",
+                            lambda *args: calls.append(1) or solve(*args))
+        result = opr.compute_component_oprs(matches)
+        # One solve for the score, one for all breakdown columns
+        assert len(calls) == 2
+        assert list(result.columns) == list(full.columns)
+        assert "rotor1Engaged" in result.columns
+        incidence, _, alliances = opr.build_incidence(matches)
+        present = alliances["autoPoints"].notnull().to_numpy()
+        assert present.sum() == len(alliances) - 2
+        expected = numpy.linalg.lstsq(
+            incidence[present],
+            alliances.loc[present, "rotor1Engaged"].astype(float),
+            rcond=None)[0]
+        numpy.testing.assert_allclose(result["rotor1Engaged"], expected,
+                                      atol=1e-9)
+
+
+class TestOprTracker(object):
+
+    def test_incremental(self, matches):
+        qual = matches[matches["comp_level"] == "qm"]
+        keys = qual.index.get_level_values("key").unique()
+        tracker = opr.OprTracker()
+        # Add matches in chunks; each call sees all matches so far
+        for end in range(10, len(keys) + 10, 10):
+            tracker.update(qual.loc[keys[:end]])
+            expected = opr.compute_oprs(qual.loc[keys[:end]])
+            pandas.testing.assert_frame_equal(tracker.oprs, expected,
+                                              atol=1e-6)
+        assert tracker.updates > 0
+        assert tracker.refactors < len(keys) / 10
+
+    def test_correction(self, matches):
+        tracker = opr.OprTracker()
+        assert tracker.update(matches) == 224
+        assert tracker.update(matches) == 0
+        corrected = matches.copy()
+        qm1 = corrected.index.get_level_values("key") == "2017tur_qm1"
+        corrected.loc[qm1 & (corrected["alliance"] == "red"), "score"] = 0
+        # The red score and the blue opponent score changed
+        assert tracker.update(corrected) == 2
+        pandas.testing.assert_frame_equal(
+            tracker.oprs, opr.compute_oprs(corrected), atol=1e-6)
+
+    def test_exact(self):
+        strength = {"frc{}".format(num): float(num) for num in range(30)}
+        matches = synthetic_matches(strength, 80)
+        tracker = opr.OprTracker(refactor_every=5)
+        tracker.update(matches.iloc[:360])
+        assert tracker.oprs.shape == (30, 3)
+        tracker.update(matches)
+        numpy.testing.assert_allclose(tracker.oprs["oprs"],
+                                      pandas.Series(strength).sort_index())
+        assert (tracker.updates, tracker.refactors) == (5, 2)
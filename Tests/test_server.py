@@ -0,0 +1,604 @@
+import asyncio
+import copy
+import gzip
+import io
+import json
+import os.path
+import pickle
+import time
+
+import pandas
+import pytest
+
+import tbap.aio as aio
+import tbap.api as api
+import tbap.server as server
+from Tests.conftest import add_response, local_session
+
+JSON_DIR = os.path.join(os.path.dirname(__file__), "..", "JSON")
+
+
+class TestConnectionPool(object):
+
+    def test_reuse(self, tba):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018})
+        with session_class("username", "key", data_format="json") as sn:
+            for _ in range(5):
+                status = api.get_status(sn)
+                assert status["code"] == 200
+                assert json.loads(status["text"]) == {"max_season": 2018}
+            assert sn.handshakes == 1
+        assert len(handler.requests) == 5
+
+    def test_idle_timeout(self, tba):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018})
+        sn = session_class("username", "key", data_format="json",
+                           idle_timeout=0)
+        api.get_status(sn)
+        api.get_status(sn)
+        assert sn.handshakes == 2
+
+    def test_http_error(self, tba):
+        session_class, _ = tba
+        sn = session_class("username", "key", data_format="json")
+        with pytest.warns(UserWarning):
+            result = server.send_http_request(sn, ["status"])
+        assert result["code"] == 404
+        assert result["error_message"] == "HTTPError, Code 404: Not Found"
+
+
+    def test_redirect(self, tba):
+        session_class, handler = tba
+        add_response(handler, "status", {}, code=301,
+                     headers={"Location": "/api/v3/status/moved"})
+        add_response(handler, "status/moved", {"max_season": 2018})
+        with session_class("username", "key", data_format="json") as sn:
+            status = api.get_status(sn)
+        assert json.loads(status["text"]) == {"max_season": 2018}
+        assert len(handler.requests) == 2
+
+    def test_redirect_other_host(self, tba):
+        session_class, handler = tba
+        moved = handler.url.replace("127.0.0.1", "localhost")
+        add_response(handler, "status", {}, code=302,
+                     headers={"Location": moved + "/status/moved"})
+        add_response(handler, "status/moved", {"max_season": 2018})
+        with session_class("username", "key", data_format="json") as sn:
+            status = api.get_status(sn)
+            assert sn.handshakes == 2
+        assert json.loads(status["text"]) == {"max_season": 2018}
+        headers = [hdrs for _, hdrs in handler.requests]
+        assert "X-TBA-Auth-Key" in headers[0]
+        assert "X-TBA-Auth-Key" not in headers[1]
+        assert "X-TBA-App-Id" not in headers[1]
+        assert "User-Agent" in headers[1]
+
+    def test_http_proxy(self, tba, monkeypatch):
+        _, handler = tba
+        proxy = handler.url.rsplit("/api", 1)[0]
+        for var in ["no_proxy", "NO_PROXY", "HTTPS_PROXY", "HTTP_PROXY"]:
+            monkeypatch.delenv(var, raising=False)
+        monkeypatch.setenv("http_proxy", proxy)
+        url = "http://tba.example/api/v3/status"
+        handler.canned[url] = (200, {}, b'{"max_season": 2018}')
+        pool = server.ConnectionPool("http://tba.example/api/v3")
+        assert pool.proxy.port == int(proxy.rsplit(":", 1)[1])
+        assert pool.request(url, {})[3] == b'{"max_season": 2018}'
+        assert handler.requests[0][0] == url
+        pool.close()
+
+    def test_https_tunnel(self, monkeypatch):
+        for var in ["no_proxy", "NO_PROXY"]:
+            monkeypatch.delenv(var, raising=False)
+        monkeypatch.setenv("https_proxy", "http://user:pw@proxy.example:3128")
+        pool = server.ConnectionPool("https://www.thebluealliance.com/api/v3")
+        conn = pool._connect()  # pylint: disable=protected-access
+        assert (conn.host, conn.port) == ("proxy.example", 3128)
+        # pylint: disable=protected-access
+        assert conn._tunnel_host == "www.thebluealliance.com"
+        assert (conn._tunnel_headers["Proxy-Authorization"] ==
+                "Basic dXNlcjpwdw==")
+
+
+class TestRetries(object):
+
+    def test_retry_after(self, tba):
+        session_class, handler = tba
+        add_response(handler, "status", {}, code=503,
+                     headers={"Retry-After": "0"})
+        busy = handler.canned["/api/v3/status"]
+        add_response(handler, "status", {"max_season": 2018})
+        handler.canned["/api/v3/status"] = [
+            busy, busy, handler.canned["/api/v3/status"]]
+        sn = session_class("username", "key", data_format="json",
+                           backoff=60)
+        result = api.get_status(sn)
+        assert result["code"] == 200
+        assert result["retries"] == 2
+        assert len(handler.requests) == 3
+        assert sn.endpoint_stats == {
+            "status": {"requests": 1, "retries": 2, "failures": 0}}
+
+    def test_give_up(self, tba):
+        session_class, handler = tba
+        add_response(handler, "team/frc1318", {}, code=429)
+        sn = session_class("username", "key", data_format="json",
+                           max_retries=2, backoff=0.01)
+        with pytest.warns(UserWarning):
+            result = api.get_team(sn, "frc1318")
+        assert result["code"] == 429
+        assert len(handler.requests) == 3
+        assert sn.endpoint_stats["team/*"] == {
+            "requests": 1, "retries": 2, "failures": 1}
+
+    def test_retry_after_date(self):
+        assert server.retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+        assert server.retry_after("2.5") == 2.5
+        assert server.retry_after(None) is None
+
+    def test_token_bucket(self, tba):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018})
+        sn = session_class("username", "key", data_format="json",
+                           rate_limit=20, burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            api.get_status(sn)
+        assert time.monotonic() - start >= 0.2
+
+
+class TestSingleFlight(object):
+
+    def test_coalesce(self, tba):
+        session_class, handler = tba
+        add_response(handler, "event/2017pncmp/rankings", {"rankings": []})
+        handler.delay = 0.3
+        sn = session_class("username", "key", data_format="json")
+        calls = [(api.get_event_rankings, {"event": "2017pncmp"})] * 6
+        results = api.fetch_many(sn, calls, max_workers=6)
+        assert len(handler.requests) == 1
+        assert sum(bool(res.get("shared")) for res in results) == 5
+        assert all(res.jdata is results[0].jdata for res in results)
+        assert sn.flights.shared == 5
+        assert sn.endpoint_stats["event/*/rankings"]["requests"] == 1
+
+    def test_force_refresh(self, tba):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018})
+        handler.delay = 0.3
+        sn = session_class("username", "key", data_format="json")
+        calls = [(api.get_status, {}), (api.get_status, {}),
+                 (api.get_status, {"force_refresh": True})]
+        results = api.fetch_many(sn, calls, max_workers=3)
+        assert len(handler.requests) == 2
+        assert not results[2].get("shared")
+        assert sum(bool(res.get("shared")) for res in results) == 1
+
+    def test_disabled(self, tba):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018})
+        handler.delay = 0.1
+        sn = session_class("username", "key", data_format="json",
+                           coalesce=False)
+        api.fetch_many(sn, [(api.get_status, {})] * 3)
+        assert len(handler.requests) == 3
+
+    def test_error(self):
+        flights = server.SingleFlight()
+        with pytest.raises(KeyError):
+            flights.do("a", lambda: {}["b"])
+        assert flights.do("a", lambda: 1) == (1, False)
+
+
+class TestCompression(object):
+
+    def test_gzip(self, tba):
+        session_class, handler = tba
+        jdata = [{"key": "frc{}".format(num), "score_breakdown": None}
+                 for num in range(1000)]
+        add_response(handler, "teams/0", jdata,
+                     headers={"Content-Encoding": "gzip"})
+        sn = session_class("username", "key", data_format="json")
+        result = api.get_teams(sn, page=0)
+        assert "gzip" in handler.requests[-1][1]["Accept-Encoding"]
+        assert result.jdata == jdata
+        assert result["decompressed_bytes"] == len(result["text"])
+        assert result["compressed_bytes"] < result["decompressed_bytes"] / 5
+
+    def test_read_body_chunks(self):
+        body = json.dumps(list(range(20000))).encode("utf-8")
+
+        class FakeResponse(object):
+            def __init__(self):
+                self.stream = io.BytesIO(gzip.compress(body))
+
+            def getheader(self, name, default=None):
+                return "gzip" if name == "Content-Encoding" else default
+
+            def read(self, size=-1):
+                return self.stream.read(size)
+
+        decoded, wire_bytes = server.read_body(FakeResponse(), chunk_size=64)
+        assert decoded == body
+        assert wire_bytes == len(gzip.compress(body))
+
+
+class TestAsync(object):
+
+    def test_gather(self, tba):
+        _, handler = tba
+        teams = ["frc{}".format(num) for num in range(1000, 1020)]
+        for team in teams:
+            add_response(handler, "team/" + team, {"key": team})
+        session_class = local_session(aio.AsyncSession, handler.url)
+
+        async def get_all():
+            async with session_class("username", "key", data_format="json",
+                                     max_workers=4) as sn:
+                results = await asyncio.gather(
+                    *[aio.get_team(sn, team) for team in teams])
+                return results, sn.handshakes
+
+        results, handshakes = asyncio.run(get_all())
+        assert [json.loads(res["text"])["key"] for res in results] == teams
+        assert handshakes <= 4
+
+    def test_exit_does_not_block(self, tba):
+        _, handler = tba
+        add_response(handler, "status", {"max_season": 2018})
+        handler.delay = 0.5
+        session_class = local_session(aio.AsyncSession, handler.url)
+
+        async def exit_while_running():
+            ticks = []
+
+            async def ticker():
+                while True:
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.ensure_future(ticker())
+            async with session_class("username", "key",
+                                     data_format="json") as sn:
+                request = asyncio.ensure_future(aio.get_status(sn))
+                await asyncio.sleep(0.1)
+                count = len(ticks)
+            exit_ticks = len(ticks) - count
+            task.cancel()
+            return exit_ticks, await request
+
+        exit_ticks, status = asyncio.run(exit_while_running())
+        assert status["code"] == 200
+        assert exit_ticks > 5
+
+
+class TestFetchMany(object):
+
+    def test_order(self, tba):
+        session_class, handler = tba
+        teams = ["frc{}".format(num) for num in range(1000, 1020)]
+        for team in teams:
+            add_response(handler, "team/" + team, {"key": team})
+        sn = session_class("username", "key", data_format="json",
+                           max_concurrency=3)
+        calls = [(api.get_team, {"team": team}) for team in teams]
+        results = api.fetch_many(sn, calls, max_workers=6)
+        assert [json.loads(res["text"])["key"] for res in results] == teams
+        assert sn.handshakes <= 3
+
+    def test_rate_limit(self, tba):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018})
+        sn = session_class("username", "key", data_format="json")
+        start = time.monotonic()
+        api.fetch_many(sn, [(api.get_status, {})] * 5, rate_limit=20)
+        assert time.monotonic() - start >= 0.2
+
+
+class TestResponseCache(object):
+
+    def test_revalidate(self, tba, tmp_path):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018},
+                     headers={"ETag": '"abc"'})
+        sn = session_class("username", "key", data_format="json",
+                           cache=str(tmp_path / "cache.sqlite"))
+        first = api.get_status(sn)
+        assert "from_cache" not in first
+
+        add_response(handler, "status", {}, code=304)
+        second = api.get_status(sn)
+        assert second["code"] == 200
+        assert second["from_cache"]
+        assert second["text"] == first["text"]
+        assert second["ETag"] == '"abc"'
+        req_headers = handler.requests[-1][1]
+        assert req_headers["If-Modified-Since"] == first["Last-Modified"]
+        assert req_headers["If-None-Match"] == '"abc"'
+
+    def test_revalidate_updates_row(self, tba, tmp_path):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018},
+                     headers={"ETag": '"abc"'})
+        sn = session_class("username", "key", data_format="json",
+                           cache=str(tmp_path / "cache.sqlite"))
+        first = api.get_status(sn)
+        stored = sn.cache.get(first["url"])["stored"]
+
+        add_response(handler, "status", {}, code=304,
+                     headers={"ETag": '"def"',
+                              "Last-Modified": "Thu, 31 Aug 2017 06:49:32 GMT",
+                              "Cache-Control": "max-age=60"})
+        second = api.get_status(sn)
+        assert second["ETag"] == '"def"'
+        row = sn.cache.get(first["url"])
+        assert row["ETag"] == '"def"'
+        assert row["Last-Modified"] == "Thu, 31 Aug 2017 06:49:32 GMT"
+        assert row["Cache-Control"] == "max-age=60"
+        assert row["stored"] >= stored
+        assert row["body"] == second.body
+
+        api.get_status(sn)
+        req_headers = handler.requests[-1][1]
+        assert req_headers["If-None-Match"] == '"def"'
+        assert req_headers["If-Modified-Since"] == row["Last-Modified"]
+
+    def test_no_store(self, tba, tmp_path):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018},
+                     headers={"Cache-Control": "private, no-store"})
+        sn = session_class("username", "key", data_format="json",
+                           cache=str(tmp_path / "cache.sqlite"))
+        result = api.get_status(sn)
+        assert result["code"] == 200
+        assert sn.cache.get(result["url"]) is None
+        api.get_status(sn)
+        assert "If-Modified-Since" not in handler.requests[-1][1]
+
+    def test_explicit_mod_since(self, tba, tmp_path):
+        session_class, handler = tba
+        add_response(handler, "status", {"max_season": 2018})
+        sn = session_class("username", "key", data_format="json",
+                           cache=str(tmp_path / "cache.sqlite"))
+        first = api.get_status(sn)
+        add_response(handler, "status", {}, code=304)
+        result = server.send_http_request(sn, ["status"],
+                                          first["Last-Modified"])
+        assert result["code"] == 304
+        assert "text" not in result
+
+
+class TestMemoryCache(object):
+
+    def test_max_age(self, tba):
+        session_class, handler = tba
+        add_response(handler, "event/2017pncmp/rankings", {"rankings": []},
+                     headers={"Cache-Control": "public, max-age=60"})
+        sn = session_class("username", "key", data_format="json",
+                           memory_cache=1000000)
+        first = api.get_event_rankings(sn, "2017pncmp")
+        second = api.get_event_rankings(sn, "2017pncmp")
+        assert second["text"] == first["text"]
+        assert second["from_cache"]
+        assert second.jdata == first.jdata
+        # The cache does not keep the parsed JSON.
+        assert second.jdata is not first.jdata
+        assert second.body is None
+        assert len(handler.requests) == 1
+        assert (sn.cache_hits, sn.cache_misses) == (1, 1)
+
+        api.get_event_rankings(sn, "2017pncmp", force_refresh=True)
+        assert len(handler.requests) == 2
+
+    def test_lru_bound(self):
+        cache = server.MemoryCache(25)
+        for url in ["a", "b", "c"]:
+            cache.put(url, server.Response({"Cache-Control": "max-age=60",
+                                            "text": "x" * 10}))
+        assert cache.size == 20
+        assert cache.get("a") is None
+        assert cache.get("c")["text"] == "x" * 10
+
+    def test_size_in_bytes(self):
+        cache = server.MemoryCache(100)
+        cache.put("a", server.Response({"Cache-Control": "max-age=60",
+                                        "text": "\u00e9" * 10}))
+        assert cache.size == 20
+
+    def test_no_store(self):
+        cache = server.MemoryCache(100)
+        cache.put("a", server.Response({"Cache-Control": "no-cache",
+                                        "text": "x"}))
+        assert cache.get("a") is None
+
+
+class TestResponse(object):
+
+    def test_parse_once(self):
+        response = server.Response(code=200, text='{"a": [1, 2]}')
+        response.body = b'{"a": [1, 2]}'
+        copy = response.copy()
+        assert copy.jdata == {"a": [1, 2]}
+        assert response.jdata is copy.jdata
+
+    def test_pickle(self):
+        response = server.Response(code=200, text='{"a": [1, 2]}')
+        assert response.jdata == {"a": [1, 2]}
+        for other in [pickle.loads(pickle.dumps(response)),
+                      copy.deepcopy(response)]:
+            assert other == response
+            assert other.jdata == {"a": [1, 2]}
+            assert other.copy().jdata is other.jdata
+
+        frames = api.LazyFrames(response, api.PREDICTION_FRAMES)
+        assert pickle.loads(pickle.dumps(frames)).data == response
+        assert copy.deepcopy(frames).data == response
+
+    def test_json_backend(self):
+        default = server.get_json_backend()
+        try:
+            assert server.set_json_backend("json") == "json"
+            assert server.json_loads(b'{"a": 1}') == {"a": 1}
+            with pytest.raises(ValueError):
+                server.set_json_backend("yaml")
+        finally:
+            server.set_json_backend(default)
+
+
+class TestAllTeams(object):
+
+    def test_pages(self, tba):
+        session_class, handler = tba
+        for page in range(3):
+            add_response(handler, "teams/{}/keys".format(page),
+                         ["frc{}".format(page * 500 + num)
+                          for num in range(500)])
+        add_response(handler, "teams/3/keys", [])
+        sn = session_class("username", "key")
+        teams = api.get_all_teams(sn, response="keys", window=2)
+        assert list(teams.columns) == ["team"]
+        assert teams.shape == (1500, 1)
+        assert teams["team"].iloc[-1] == "frc1499"
+        assert len(handler.requests) == 4
+
+    def test_year(self, tba):
+        session_class, handler = tba
+        add_response(handler, "teams/2017/0", [{"key": "frc1318",
+                                                "nickname": "IRS"}])
+        for page in range(1, 4):
+            add_response(handler, "teams/2017/{}".format(page), [])
+        sn = session_class("username", "key")
+        teams = api.get_all_teams(sn, year=2017)
+        assert teams.loc["frc1318", "nickname"] == "IRS"
+
+
+class TestEvents(object):
+
+    def test_district_columns(self, tba):
+        session_class, handler = tba
+        add_response(handler, "events/2017/simple", [
+            {"key": "2017casj", "district": None, "webcasts": [],
+             "division_keys": []},
+            {"key": "2017wasno", "webcasts": [], "division_keys": [],
+             "district": {"abbreviation": "pnw", "key": "2017pnw"}}])
+        sn = session_class("username", "key")
+        events = api.get_events(sn, year=2017, response="simple")
+        assert events.loc["2017wasno", "district.abbreviation"] == "pnw"
+        assert pandas.isnull(events.loc["2017casj", "district.key"])
+        assert "district" not in events.columns
+
+
+class TestIterators(object):
+
+    def test_iter_teams(self, tba):
+        session_class, handler = tba
+        for page in range(2):
+            add_response(handler, "teams/{}".format(page),
+                         [{"key": "frc{}".format(page * 500 + num),
+                           "team_number": page * 500 + num}
+                          for num in range(500)])
+        add_response(handler, "teams/2", [])
+        sn = session_class("username", "key")
+        chunks = list(api.iter_teams(sn))
+        assert [chunk.shape for chunk in chunks] == [(500, 1), (500, 1)]
+        assert chunks[1].loc["frc999", "team_number"] == 999
+
+    def test_iter_matches(self, tba):
+        session_class, handler = tba
+        with open(os.path.join(JSON_DIR,
+                               "tba_matches_event_2017tur.json")) as file:
+            jdata = json.load(file)
+        events = ["2017tur", "2017pncmp"]
+        for event in events:
+            add_response(handler, "event/{}/matches".format(event), jdata)
+        sn = session_class("username", "key")
+        chunks = dict(api.iter_matches(sn, events))
+        assert sorted(chunks) == sorted(events)
+        expected = api.get_matches(sn, event="2017tur")
+        for frame in chunks.values():
+            assert frame.equals(expected)
+        raw = dict(api.iter_matches(sn, events, raw=True))
+        assert raw["2017pncmp"] == jdata
+
+
+class TestMatchTracker(object):
+
+    def test_update(self, tba):
+        session_class, handler = tba
+        with open(os.path.join(JSON_DIR,
+                               "tba_matches_event_2017tur.json")) as file:
+            jdata = json.load(file)
+        add_response(handler, "event/2017tur/matches", jdata[:-3])
+        sn = session_class("username", "key")
+        tracker = api.MatchTracker(sn, "2017tur")
+        assert len(tracker.update()) == len(jdata) - 3
+
+        add_response(handler, "event/2017tur/matches", {}, code=304)
+        assert tracker.update() == []
+        assert handler.requests[-1][1]["If-Modified-Since"] == \
+            tracker.last_modified
+
+        jdata[0]["alliances"]["red"]["score"] = 999
+        add_response(handler, "event/2017tur/matches", jdata)
+        keys = tracker.update()
+        assert keys == [mtch["key"] for mtch in [jdata[0]] + jdata[-3:]]
+        red = tracker.frame.loc[jdata[0]["key"]].query("alliance == 'red'")
+        assert list(red["score"]) == [999, 999, 999]
+        expected = api.get_matches(sn, event="2017tur")
+        pandas.testing.assert_frame_equal(tracker.frame, expected)
+
+
+class TestPredictions(object):
+
+    def test_lazy(self, tba):
+        session_class, handler = tba
+        with open(os.path.join(JSON_DIR, "predictions.json")) as file:
+            add_response(handler, "event/2017pncmp/predictions",
+                         json.load(file))
+        sn = session_class("username", "key")
+        frames = api.get_predictions(sn, "2017pncmp")
+        assert list(frames) == ["event_stats", "predictions",
+                                "team_rankings", "team_stats"]
+        assert "not built" in repr(frames)
+        assert frames["team_rankings"].loc["frc3238", "rank"] == 1
+        assert frames["team_rankings"] is frames["team_rankings"]
+        team_stats = frames["team_stats"]
+        assert team_stats.shape == (768, 1)
+        assert team_stats.index.names == ["team", "statistic", "point",
+                                          "level"]
+        assert team_stats.loc[("frc1294", "score", "mean", "qual"),
+                              "value"] == pytest.approx(73.653914)
+        assert team_stats.loc[("frc1294", "gears", "var", "playoff"),
+                              "value"] == pytest.approx(1.209887)
+
+        subset = api.get_predictions(sn, "2017pncmp",
+                                     frames=["team_rankings"])
+        assert list(subset) == ["team_rankings"]
+        assert "not built" not in repr(subset)
+        with pytest.raises(KeyError):
+            subset["team_stats"]  # pylint: disable=pointless-statement
+        with pytest.raises(server.ArgumentError):
+            api.get_predictions(sn, "2017pncmp", frames=["teams"])
+
+    def test_many_statistics(self):
+        stats = {"stat{:03}".format(num): {"mean": {"frc1": num,
+                                                    "frc2": -num}}
+                 for num in range(200)}
+        team_stats = api.build_team_stats(
+            {"stat_mean_vars": {"qual": stats}})
+        assert team_stats.shape == (400, 1)
+        assert team_stats.loc[("frc1", "stat150", "mean", "qual"),
+                              "value"] == 150
+        assert team_stats.loc[("frc2", "stat199", "mean", "qual"),
+                              "value"] == -199
+        expected = pandas.DataFrame(
+            [(team, stat, "mean", "qual", float(point[team]))
+             for stat, stat_data in stats.items()
+             for point in stat_data.values() for team in point],
+            columns=["team", "statistic", "point", "level", "value"])
+        expected = expected.set_index(
+            ["team", "statistic", "point", "level"]).sort_index()
+        pandas.testing.assert_frame_equal(team_stats, expected,
+                                          check_index_type=False)
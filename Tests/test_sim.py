@@ -0,0 +1,88 @@
+import numpy
+import pandas
+import pytest
+
+import tbap.server as server
+import tbap.sim as sim
+
+
+def match_rows(key, blue, red, blue_score=-1, red_score=-1, breakdown=None):
+    """Returns the match dataframe rows of one qualification match."""
+    if blue_score < 0:
+        winner = ""
+    else:
+        winner = ("blue" if blue_score > red_score else
+                  "red" if red_score > blue_score else "")
+    rows = []
+    for alliance, teams, score in [("blue", blue, blue_score),
+                                   ("red", red, red_score)]:
+        for team in teams:
+            row = {"key": key, "team_key": team, "alliance": alliance,
+                   "surrogate": False, "comp_level": "qm", "score": score,
+                   "winning_alliance": winner}
+            row.update((breakdown or {}).get(alliance, {}))
+            rows.append(row)
+    return rows
+
+
+def prediction_rows(key, blue, red):
+    """Returns predictions dataframe rows from (score, var, gears,
+    pressure) tuples for each alliance."""
+    rows = []
+    for alliance, values in [("blue", blue), ("red", red)]:
+        for stat, val in zip(["score", "score_var", "prob_gears",
+                              "prob_pressure"], values):
+            rows.append({"level": "qual", "match": key,
+                         "alliance": alliance, "statistic": stat,
+                         "value": val})
+    return rows
+
+
+@pytest.fixture
+def event():
+    teams = ["frc{}".format(num) for num in range(1, 7)]
+    bonus = {"kPaRankingPointAchieved": True,
+             "rotorRankingPointAchieved": False}
+    rows = (match_rows("qm1", teams[:3], teams[3:], 100, 50,
+                       {"blue": bonus}) +
+            match_rows("qm2", teams[3:], teams[:3]))
+    matches = pandas.DataFrame(rows).set_index(["key", "team_key"])
+    predictions = pandas.DataFrame(
+        prediction_rows("qm2", (300, 1, 1.0, 0.0), (10, 1, 0.0, 0.0))
+    ).set_index(["level", "match", "alliance", "statistic"])
+    return matches, predictions
+
+
+class TestSimulateRankings(object):
+
+    def test_certain(self, event):
+        matches, predictions = event
+        # frc1-3: 3 RP from qm1. frc4-6: 3 RP from qm2 and more points.
+        probs = sim.simulate_rankings(matches, predictions, num_sims=1000,
+                                      batch_size=300, seed=0)
+        assert list(probs.index[:3]) == ["frc4", "frc5", "frc6"]
+        assert probs.shape == (6, 6)
+        numpy.testing.assert_allclose(probs.sum(axis=0), 1)
+        numpy.testing.assert_allclose(probs.sum(axis=1), 1)
+        assert probs.loc[["frc1", "frc2", "frc3"], [1, 2, 3]].sum().sum() == 0
+
+    def test_ranking_points(self, event):
+        matches, predictions = event
+        earned = pandas.Series({"frc1": 10})
+        probs = sim.simulate_rankings(matches, predictions, num_sims=100,
+                                      ranking_points=earned, seed=0)
+        assert probs.loc["frc1", 1] == 1
+
+    def test_missing_prediction(self, event):
+        matches, predictions = event
+        with pytest.raises(server.ArgumentError):
+            sim.simulate_rankings(matches, predictions.iloc[:4], num_sims=10)
+
+    def test_surrogate(self):
+        rows = match_rows("qm1", ["frc1", "frc2", "frc3"],
+                          ["frc4", "frc5", "frc6"], 100, 50)
+        rows.append(dict(rows[0], surrogate=True))
+        matches = pandas.DataFrame(rows)
+        ranking, points = sim.earned_points(sim.team_rows(matches))
+        assert "frc1" not in ranking.index
+        assert ranking["frc2"] == 2 and points["frc2"] == 100
@@ -0,0 +1,60 @@
+"""Times tbap.dframe.build_table on a large list of team objects.
+
+Run from the repository root::
+
+    python benchmarks/bench_build_table.py
+
+The previous implementation, json_normalize() followed by dropping
+the dictionary columns, is timed against build_table() on records
+that all have the same structure and on records whose nested objects
+do not. The results for the uniform records are checked for equality
+before they are timed.
+"""
+import os.path
+import sys
+import timeit
+
+import pandas
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import tbap.dframe as dframe  # pylint: disable=wrong-import-position
+
+
+def team(num, championships):
+    """Returns a team object like those of the teams endpoints."""
+    return {"key": "frc{}".format(num), "team_number": num,
+            "nickname": "Team {}".format(num), "city": "Seattle",
+            "rookie_year": 1992 + num % 25, "website": None, "motto": None,
+            "home_championship": championships,
+            "location": {"lat": 47.6, "lng": -122.3,
+                         "gmaps": {"place_id": "id{}".format(num)}}}
+
+
+def normalize_table(jdata):
+    """The previous implementation of tbap.dframe.build_table."""
+    dframe_ = pandas.json_normalize(jdata)
+    for key, val in jdata[0].items():
+        if isinstance(val, dict) and key in dframe_.columns:
+            dframe_.drop(key, axis=1, inplace=True)
+    return dframe_
+
+
+def main(size=20000, repeat=5, number=5):
+    champs = {"2017": "Houston", "2018": "Detroit"}
+    uniform = [team(num, champs) for num in range(size)]
+    mixed = [team(num, None if num % 3 else champs) for num in range(size)]
+    mixed[0]["home_championship"] = {"2017": "Houston"}
+    pandas.testing.assert_frame_equal(normalize_table(uniform),
+                                      dframe.build_table(uniform))
+
+    cases = [("json_normalize", lambda: normalize_table(uniform)),
+             ("build_table", lambda: dframe.build_table(uniform)),
+             ("mixed json_normalize", lambda: normalize_table(mixed)),
+             ("mixed build_table", lambda: dframe.build_table(mixed))]
+    for name, func in cases:
+        best = min(timeit.repeat(func, repeat=repeat, number=number))
+        print("{:24}{:>9.3f}ms".format(name, best / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
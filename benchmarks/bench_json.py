@@ -0,0 +1,53 @@
+"""Compares the JSON libraries supported by tbap.server.set_json_backend.
+
+Run from the repository root::
+
+    python benchmarks/bench_json.py
+
+Each installed library parses the fixtures in the JSON folder, as bytes,
+the same way tbap.server.Response does. Libraries that are not
+installed are skipped.
+"""
+import os.path
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import tbap.server as server  # pylint: disable=wrong-import-position
+
+JSON_DIR = os.path.join(os.path.dirname(__file__), "..", "JSON")
+FIXTURES = ["predictions.json", "scores.json",
+            "tba_matches_event_2017tur.json",
+            "tba_matches_team_frc1318_year_2017.json"]
+
+
+def main(repeat=5, number=20):
+    backends = []
+    for name in server.JSON_BACKENDS:
+        try:
+            server.set_json_backend(name)
+        except ImportError:
+            print("{} is not installed.".format(name))
+            continue
+        backends.append(name)
+
+    print()
+    print("{:42}{:>10}".format("fixture (size)", "") +
+          "".join("{:>10}".format(name) for name in backends))
+    for fixture in FIXTURES:
+        with open(os.path.join(JSON_DIR, fixture), "rb") as file:
+            body = file.read()
+        times = []
+        for name in backends:
+            server.set_json_backend(name)
+            best = min(timeit.repeat(lambda: server.json_loads(body),
+                                     repeat=repeat, number=number))
+            times.append(best / number * 1000)
+        label = "{} ({} KB)".format(fixture, len(body) // 1024)
+        print("{:52}".format(label) +
+              "".join("{:>9.2f}ms".format(tm) for tm in times))
+    server.set_json_backend()
+
+
+if __name__ == "__main__":
+    main()
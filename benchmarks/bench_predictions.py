@@ -0,0 +1,59 @@
+"""Times the team_stats dataframe of tbap.api.get_predictions.
+
+Run from the repository root::
+
+    python benchmarks/bench_predictions.py
+
+The *stat_mean_vars* section of JSON/predictions.json is converted by
+tbap.api.build_team_stats and by the previous implementation, which
+built one dictionary per value and then called set_index. Both
+results are checked for equality before they are timed.
+"""
+import json
+import os.path
+import sys
+import timeit
+
+import pandas
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import tbap.api as api  # pylint: disable=wrong-import-position
+
+JSON_DIR = os.path.join(os.path.dirname(__file__), "..", "JSON")
+
+
+def row_dict_team_stats(jdata):
+    """The previous implementation of tbap.api.build_team_stats."""
+    jdata_teams = jdata["stat_mean_vars"]
+    levels = list(jdata_teams.keys())
+    stats = list(jdata_teams[levels[0]].keys())
+    points = list(jdata_teams[levels[0]][stats[0]].keys())
+    teams = list(jdata_teams[levels[0]][stats[0]][points[0]].keys())
+    rows = []
+    for team in teams:
+        for lvl, lvl_data in jdata_teams.items():
+            for stat, stat_data in lvl_data.items():
+                for point, point_data in stat_data.items():
+                    rows.append({"team": team, "level": lvl, "statistic": stat,
+                                 "point": point, "value": point_data[team]})
+    return pandas.DataFrame(rows).set_index(["team", "statistic", "point",
+                                             "level"])
+
+
+def main(repeat=7, number=200):
+    with open(os.path.join(JSON_DIR, "predictions.json")) as file:
+        jdata = json.load(file)
+    pandas.testing.assert_frame_equal(row_dict_team_stats(jdata),
+                                      api.build_team_stats(jdata))
+
+    times = []
+    for func in [row_dict_team_stats, api.build_team_stats]:
+        best = min(timeit.repeat(lambda: func(jdata),  # pylint: disable=cell-var-from-loop
+                                 repeat=repeat, number=number))
+        times.append(best / number * 1000)
+        print("{:24}{:>9.3f}ms".format(func.__name__, times[-1]))
+    print("{:24}{:>9.1f}x".format("speedup", times[0] / times[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Coroutine versions of the tbap.api functions.
+
+Each function in this module has the same name, arguments, and return
+value as the corresponding function in ``tbap.api``, but is a
+coroutine that can be awaited or passed to ``asyncio.gather``. For
+example, the following code retrieves the matches for several teams
+concurrently::
+
+    async def team_matches(teams):
+        async with aio.AsyncSession("username", "key") as sn:
+            return await asyncio.gather(
+                *[aio.get_matches(sn, team=tm, year=2017) for tm in teams])
+
+The HTTP requests are sent on the session's thread pool executor and
+share the session's keep-alive connection pool, so the total time is
+close to that of the slowest individual request. Conversion of the
+JSON response into a dataframe is the same as in ``tbap.api``.
+"""
+import asyncio
+import concurrent.futures
+import functools
+
+import tbap.api as api
+
+
+class AsyncSession(api.Session):
+    """A Session for use with the coroutines in ``tbap.aio``.
+
+    An AsyncSession accepts all arguments and has all attributes of
+    ``tbap.api.Session``. It also owns the thread pool executor that
+    the coroutines use to send HTTP requests.
+
+    Attributes:
+        max_workers: (int)
+            The maximum number of requests that are sent concurrently.
+        executor: (concurrent.futures.ThreadPoolExecutor)
+            The executor used to send HTTP requests.
+    """
+
+    def __init__(self, username, key, max_workers=8, **kwargs):
+        """Creates an ``AsyncSession`` object.
+
+        Args:
+            username: (str)
+                The blue alliance account username.
+            key: (str)
+                The authorization key assigned by The Blue Alliance.
+            max_workers: (int)
+                The maximum number of concurrent requests. Optional.
+                Default is 8. Also used as the default *pool_size* and
+                *max_concurrency*.
+            **kwargs:
+                Other keyword arguments accepted by
+                ``tbap.api.Session``.
+        """
+        kwargs.setdefault("pool_size", max_workers)
+        kwargs.setdefault("max_concurrency", max_workers)
+        super().__init__(username, key, **kwargs)
+        self.max_workers = max_workers
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            self.max_workers, thread_name_prefix="tbap")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # close() waits for running requests, so it must not block the
+        #   event loop.
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self):
+        """Shuts down the executor and closes all idle connections.
+
+        Waits for requests that are still running to finish. Coroutines
+        should leave the ``async with`` block instead of calling close(),
+        which waits without blocking the event loop.
+        """
+        self.executor.shutdown(wait=True)
+        super().close()
+
+
+def _coroutine(func):
+    """Wraps a tbap.api function so that it runs on the session executor.
+
+    Sessions that are not AsyncSession objects use the event loop's
+    default executor.
+    """
+    @functools.wraps(func)
+    async def wrapper(session, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, session, *args, **kwargs)
+        return await loop.run_in_executor(getattr(session, "executor", None),
+                                          call)
+    return wrapper
+
+
+get_status = _coroutine(api.get_status)
+get_districts = _coroutine(api.get_districts)
+get_teams = _coroutine(api.get_teams)
+get_all_teams = _coroutine(api.get_all_teams)
+get_team = _coroutine(api.get_team)
+get_events = _coroutine(api.get_events)
+get_matches = _coroutine(api.get_matches)
+get_district_rankings = _coroutine(api.get_district_rankings)
+get_awards = _coroutine(api.get_awards)
+get_alliances = _coroutine(api.get_alliances)
+get_insights = _coroutine(api.get_insights)
+get_oprs = _coroutine(api.get_oprs)
+get_predictions = _coroutine(api.get_predictions)
+get_event_team_status = _coroutine(api.get_event_team_status)
+get_event_rankings = _coroutine(api.get_event_rankings)
+get_district_points = _coroutine(api.get_district_points)
+get_media = _coroutine(api.get_media)
+get_social_media = _coroutine(api.get_social_media)
@@ -65,6 +65,12 @@ functions:
     returned in the "Last-Modified" attribute and provide that value
     in the mod_since attribute on subsequent requests for the same
     data to reduce load on the Read API server.
+**force_refresh**
+    A boolean, always optional and False by default. If the session
+    was created with a *memory_cache* size, responses are kept in
+    memory for as long as the server's *Cache-Control: max-age* header
+    allows, and repeated calls are answered without contacting the
+    server. Set *force_refresh* to True to bypass the memory cache.
 
 Tbap Function Return Values
 ===========================
@@ -72,10 +78,12 @@ Tbap Function Return Values
 
 """
 import collections
-import json
+import collections.abc
+import concurrent.futures
+import threading
 import re
 
-import pandas.io.json
+import numpy
 import pandas
 import pytz
 
@@ -83,20 +91,25 @@ import tbap.server as server
 import tbap.dframe as dframe
 
 
-def get_status(session):
+def get_status(session, force_refresh=False):
     """ Gets the status of the Blue Alliance Read API server.
 
     Args:
         session: (api.Session)
             An object created with the api.Session() constructor.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
     Returns:
         Either a pandas.Dataframe object or a Python dictionary object.
     """
     http_args = ["status"]
-    return send_request(session, http_args, "single_column")
+    return send_request(session, http_args, "single_column",
+                        force_refresh=force_refresh)
 
 
-def get_districts(session, year=None, team=None, mod_since=None):
+def get_districts(session, year=None, team=None, mod_since=None,
+                  force_refresh=False):
     """
     Retrieves information on FIRST districts.
 
@@ -110,6 +123,9 @@ def get_districts(session, year=None, team=None, mod_since=None):
         mod_since:
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         Either a pandas.Dataframe object or a Python dictionary object.
@@ -120,12 +136,13 @@ def get_districts(session, year=None, team=None, mod_since=None):
         http_args = ["districts", year]
     else:
         raise server.ArgumentError("Incorrect Arguments")
-    return send_request(session, http_args, "table", "key", mod_since)
+    return send_request(session, http_args, "table", "key", mod_since,
+                        force_refresh)
 
 
 def get_teams(session,  # pylint: disable=too-many-arguments
               page=None, year=None, event=None, district=None,
-              response="full", mod_since=None):
+              response="full", mod_since=None, force_refresh=False):
     """Retrieves FRC teams from the TBA Read API Server.
 
     Args:
@@ -153,6 +170,9 @@ def get_teams(session,  # pylint: disable=too-many-arguments
         mod_since:
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
@@ -183,13 +203,137 @@ def get_teams(session,  # pylint: disable=too-many-arguments
         raise server.ArgumentError("Incorrect Arguments")
     if response.lower() in ["simple", "keys"]:
         http_args.append(response.lower())
-    results = send_request(session, http_args, "table", "key", mod_since)
+    results = send_request(session, http_args, "table", "key", mod_since,
+                           force_refresh)
     if response == "keys":
         results.columns = ["team"]
     return results
 
 
-def get_team(session, team, response="full", mod_since=None):
+def get_all_teams(session, year=None, response="full", window=4,
+                  force_refresh=False):
+    """Retrieves all FRC teams, fetching several pages at a time.
+
+    The TBA Read API returns teams in pages of 500. get_all_teams()
+    requests *window* pages concurrently and continues with the next
+    window until a page comes back empty. The teams from all pages are
+    combined into one dataframe.
+
+    Args:
+        session (tbap.api.Session):
+            An instance of tbap.api.Session that contains
+            a valid username and authorization key.
+        year (int or str):
+            If specified, only teams that competed in that year are
+            returned. Optional.
+        response (str):
+            Either "full" (default), "simple", or "keys". Optional.
+        window (int):
+            The number of pages requested concurrently. Optional.
+            Default is 4.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
+
+    Returns:
+        A pandas.Dataframe object. If session.data_format is "json",
+        returns a list of the Python dictionaries for each non-empty
+        page. If a page request fails, returns the Python dictionary
+        for that page.
+    """
+    http_args = ["teams"] if year is None else ["teams", year]
+    suffix = [response.lower()] if response.lower() in ["simple",
+                                                        "keys"] else []
+
+    def get_page(page):
+        return server.send_http_request(session, http_args + [page] + suffix,
+                                        force_refresh=force_refresh)
+
+    pages = []
+    with concurrent.futures.ThreadPoolExecutor(window) as executor:
+        first_page = 0
+        while True:
+            batch = executor.map(get_page,
+                                 range(first_page, first_page + window))
+            for page in batch:
+                if page["code"] != 200:
+                    return page
+                if not page.jdata:
+                    break
+                pages.append(page)
+            else:
+                first_page += window
+                continue
+            break
+
+    if session.data_format != "dataframe":
+        return pages
+    records = [record for page in pages for record in page.jdata]
+    if response == "keys":
+        return pandas.DataFrame({"team": records})
+    if not records:
+        return pandas.DataFrame()
+    return dframe.build_table(records).set_index("key")
+
+
+def iter_teams(session, year=None, response="full", raw=False):
+    """Yields FRC teams one page at a time.
+
+    Each page is yielded as soon as it has been received, while the
+    request for the following page is already in progress. Iteration
+    stops at the first empty page.
+
+    Args:
+        session (tbap.api.Session):
+            An instance of tbap.api.Session that contains
+            a valid username and authorization key.
+        year (int or str):
+            If specified, only teams that competed in that year are
+            returned. Optional.
+        response (str):
+            Either "full" (default), "simple", or "keys". Optional.
+        raw (bool):
+            If True, yields the parsed JSON list of teams instead of a
+            dataframe. Optional. Default is False.
+
+    Yields:
+        One dataframe per page, in the same format as the result of
+        get_teams(). If session.data_format is "json", yields the
+        Python dictionary for each page. If a request fails, yields
+        the Python dictionary returned by the server and stops.
+    """
+    http_args = ["teams"] if year is None else ["teams", year]
+    suffix = [response.lower()] if response.lower() in ["simple",
+                                                        "keys"] else []
+
+    def get_page(page):
+        return server.send_http_request(session, http_args + [page] + suffix)
+
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        page = 0
+        future = executor.submit(get_page, page)
+        while True:
+            http_response = future.result()
+            if http_response["code"] != 200:
+                yield http_response
+                return
+            if not http_response.jdata:
+                return
+            page += 1
+            future = executor.submit(get_page, page)
+            if raw:
+                yield http_response.jdata
+            elif session.data_format != "dataframe":
+                yield http_response
+            else:
+                results = build_frame(http_response, "table", "key")
+                if response == "keys":
+                    results.columns = ["team"]
+                yield results
+
+
+def get_team(session, team, response="full", mod_since=None,
+             force_refresh=False):
     """Retrieves information about a single FRC team.
 
     Args:
@@ -204,6 +348,9 @@ def get_team(session, team, response="full", mod_since=None):
         mod_since:
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
@@ -211,7 +358,8 @@ def get_team(session, team, response="full", mod_since=None):
     http_args = ["team", team]
     if response.lower() in ["simple", "years_participated", "robots"]:
         http_args.append(response.lower())
-    results = send_request(session, http_args, "table", "key", mod_since)
+    results = send_request(session, http_args, "table", "key", mod_since,
+                           force_refresh)
     if response == "years_participated":
         results.columns = ["year"]
     return results
@@ -219,7 +367,7 @@ def get_team(session, team, response="full", mod_since=None):
 
 def get_events(session,  # pylint: disable=too-many-arguments
                year=None, district=None, team=None, event=None, response="full",
-               mod_since=None):
+               mod_since=None, force_refresh=False):
     """Retrieves information on one or more FRC competitions.
 
     Args:
@@ -241,6 +389,9 @@ def get_events(session,  # pylint: disable=too-many-arguments
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
@@ -272,14 +423,17 @@ def get_events(session,  # pylint: disable=too-many-arguments
         raise server.ArgumentError("Incorrect Arguments")
     if response.lower() in ["simple", "keys"]:
         http_args.append(response.lower())
-    results = send_request(session, http_args, "table", "key", mod_since)
+    results = send_request(session, http_args, "table", "key", mod_since,
+                           force_refresh)
     if response == "keys":
         results.columns = ["key"]
-    return dframe.expand_column(results, "district")
+    return results
 
 
-def get_matches(session, event=None, team=None, year=None, match=None,
-                response="full", mod_since=None):
+def get_matches(session,  # pylint: disable=too-many-arguments
+                event=None, team=None, year=None, match=None,
+                response="full", mod_since=None, force_refresh=False,
+                epoch_times=False):
     """Returns detailed information on competition matches.
 
     The allowed combinations of optional arguments are *event*,
@@ -309,11 +463,18 @@ def get_matches(session, event=None, team=None, year=None, match=None,
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
+        epoch_times (bool):
+            If True, time columns are left as integer seconds since the
+            Unix epoch instead of being converted to timestamps.
+            Optional. Default is False.
 
     Returns:
-        A pandas.Dataframe object or a Python dictionary object. All
-        columnes with time data contain pandas.Timestamp objects. All
-        times are in universal coordinated time (UTC).
+        A pandas.Dataframe object or a Python dictionary object. Unless
+        *epoch_times* is True, all columns with time data contain
+        pandas.Timestamp objects in the session's time zone.
 
     Raises:
         tbap.Classes.ArgumentError: If any unallowed combinations of
@@ -334,56 +495,44 @@ def get_matches(session, event=None, team=None, year=None, match=None,
         raise server.ArgumentError("Incorrect Arguments")
     if response.lower() in ["simple", "keys"]:
         http_args.append(response.lower())
-    http_data = server.send_http_request(session, http_args, mod_since)
+    http_data = server.send_http_request(session, http_args, mod_since,
+                                         force_refresh)
     if session.data_format != "dataframe" or http_data["code"] != 200:
         return http_data
 
+    return build_match_frame(session, http_data, response, epoch_times)
+
+
+def build_match_frame(session, http_data, response="full", epoch_times=False):
+    """Converts a get_matches() response into a dataframe.
+
+    Args:
+        session (tbap.api.Session):
+            The session whose time zone is used for time columns.
+        http_data (tbap.server.Response):
+            A response to a TBA matches request.
+        response (str):
+            Either "full" (default), "simple", or "keys". Optional.
+        epoch_times (bool):
+            If True, time columns are not converted. Optional.
+
+    Returns:
+        A pandas.Dataframe object, indexed by match key and team key
+        unless *response* is "keys".
+    """
     if response.lower() == "keys":
         df = dframe.build_table(http_data)
         df.columns = ["key"]
         return server.attach_attributes(df, http_data)
 
     # Convert nested JSON text into a flat dataframe
-    jdata = json.loads(http_data["text"])
+    jdata = http_data.jdata
     if not isinstance(jdata, list):
         jdata = [jdata]  # TBA returns single match when match arg used
 
-    def extract_match(mtch, team_key, alliance, surrogate):
-        output = collections.OrderedDict(
-            [("team_key", team_key),
-             ("alliance", alliance),
-             ("surrogate", surrogate),
-             ("score", mtch["alliances"][alliance]["score"])])
-        if team_key in mtch["alliances"][alliance]["dq_team_keys"]:
-            output["disqualified"] = True
-        else:
-            output["disqualified"] = False
-        for key, val in mtch.items():
-            if not isinstance(val, list) and not isinstance(val, dict):
-                output[key] = val
-        if "score_breakdown" in mtch and mtch["score_breakdown"] is not None:
-            for key, val in mtch["score_breakdown"][alliance].items():
-                output[key] = val
-        return output
-
-    matches = []
-    for indv_match in jdata:
-        for team in indv_match["alliances"]["blue"]["team_keys"]:
-            matches.append(extract_match(indv_match, team, "blue", False))
-        for team in indv_match["alliances"]["blue"]["surrogate_team_keys"]:
-            matches.append(extract_match(indv_match, team, "blue", True))
-        for team in indv_match["alliances"]["red"]["team_keys"]:
-            matches.append(extract_match(indv_match, team, "red", False))
-        for team in indv_match["alliances"]["red"]["surrogate_team_keys"]:
-            matches.append(extract_match(indv_match, team, "red", True))
-
-    df = pandas.DataFrame(matches)
-    if "score_breakdown" in df.columns:
-        df.drop("score_breakdown", 1, inplace=True)
-
-    for col in [x for x in df.columns if re.search("time$", x) is not None]:
-        ts = pandas.to_datetime(df[col], unit="s")
-        df[col] = ts.dt.tz_localize("UTC").dt.tz_convert(session.time_zone)
+    df = dframe.build_match_table(jdata)
+    if not epoch_times:
+        dframe.convert_times(df, session.time_zone)
 
     df.set_index(["key", "team_key"], inplace=True)
 
@@ -391,7 +540,149 @@ def get_matches(session, event=None, team=None, year=None, match=None,
                                     {"timezone": str(session.time_zone)})
 
 
-def get_district_rankings(session, district, mod_since=None):
+def iter_matches(session, events,  # pylint: disable=too-many-arguments
+                 response="full", raw=False, max_workers=4,
+                 epoch_times=False):
+    """Yields the matches of several events as each response arrives.
+
+    The requests for all events are sent concurrently. Each event's
+    matches are yielded as soon as its response has been received and
+    converted, so the caller can process or store each event without
+    holding all matches in memory.
+
+    Args:
+        session (tbap.api.Session):
+            An instance of tbap.api.Session that contains
+            a valid username and authorization key.
+        events (list):
+            Event keys, e.g., ["2017pncmp", "2017tur"].
+        response (str):
+            Either "full" (default), "simple", or "keys". Optional.
+        raw (bool):
+            If True, yields the parsed JSON list of matches instead of
+            a dataframe. Optional. Default is False.
+        max_workers (int):
+            The number of concurrent requests. Optional. Default is 4.
+        epoch_times (bool):
+            If True, time columns are left as integer seconds since the
+            Unix epoch. Optional. Default is False.
+
+    Yields:
+        (event, matches) tuples in the order the responses arrive.
+        *matches* has the same format as the result of get_matches().
+        If a request fails, *matches* is the Python dictionary
+        returned by the server.
+    """
+    suffix = [response.lower()] if response.lower() in ["simple",
+                                                        "keys"] else []
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        futures = {executor.submit(server.send_http_request, session,
+                                   ["event", event, "matches"] + suffix):
+                   event for event in events}
+        for future in concurrent.futures.as_completed(futures):
+            http_data = future.result()
+            if http_data["code"] != 200:
+                yield futures[future], http_data
+            elif raw:
+                yield futures[future], http_data.jdata
+            elif session.data_format != "dataframe":
+                yield futures[future], http_data
+            else:
+                yield futures[future], build_match_frame(
+                    session, http_data, response, epoch_times)
+
+
+class MatchTracker(object):
+    """Keeps an event's match dataframe up to date as matches are played.
+
+    Each call to update() requests the event's matches with the
+    *If-Modified-Since* header set from the previous response. When the
+    server returns new data, the match list is compared with the
+    previous list by match key, and only matches that are new or have
+    changed are flattened. Their rows replace the old rows of the same
+    matches, so the cost of an update depends on the number of changed
+    matches rather than the size of the event.
+
+    Attributes:
+        session: (tbap.api.Session)
+        event: (str) The event key, e.g., "2017pncmp".
+        frame: (pandas.DataFrame) The same dataframe that get_matches()
+            returns, or None before the first successful update.
+        last_modified: (str) The *Last-Modified* value of the last
+            response that contained data.
+        epoch_times: (bool) If True, time columns are not converted.
+    """
+
+    def __init__(self, session, event, epoch_times=False):
+        self.session = session
+        self.event = event
+        self.epoch_times = epoch_times
+        self.frame = None
+        self.last_modified = None
+        self._matches = collections.OrderedDict()
+
+    def update(self, force_refresh=False):
+        """Fetches the event's matches and patches the dataframe.
+
+        Args:
+            force_refresh (bool):
+                If True, the request is sent without the
+                *If-Modified-Since* header. Optional.
+
+        Returns:
+            A list of the keys of the matches that were added, changed,
+            or removed. The list is empty if nothing changed or the
+            request failed.
+        """
+        mod_since = None if force_refresh else self.last_modified
+        http_data = server.send_http_request(
+            self.session, ["event", self.event, "matches"], mod_since,
+            force_refresh)
+        if http_data["code"] != 200:
+            return []
+        self.last_modified = http_data.get("Last-Modified")
+
+        matches = collections.OrderedDict((mtch["key"], mtch)
+                                          for mtch in http_data.jdata)
+        changed = [mtch for key, mtch in matches.items()
+                   if self._matches.get(key) != mtch]
+        removed = [key for key in self._matches if key not in matches]
+        self._matches = matches
+        if not changed and not removed:
+            return []
+
+        part = dframe.build_match_table(changed)
+        if not part.empty:
+            if not self.epoch_times:
+                dframe.convert_times(part, self.session.time_zone)
+            part.set_index(["key", "team_key"], inplace=True)
+        keys = [mtch["key"] for mtch in changed] + removed
+        if self.frame is None:
+            self.frame = part
+        else:
+            match_keys = self.frame.index.get_level_values("key")
+            kept = self.frame[~match_keys.isin(keys)]
+            if part.empty:
+                self.frame = kept
+            else:
+                self.frame = pandas.concat([kept, part])
+                # A column with only None values in the changed matches
+                #   has object dtype, which the concat propagates.
+                dtypes = kept.dtypes.reindex(part.columns)
+                mixed = list(part.columns[dtypes.notnull() &
+                                          (dtypes != part.dtypes)])
+                if mixed:
+                    self.frame[mixed] = self.frame[mixed].infer_objects()
+            # Restore the server's match order
+            order = pandas.Categorical(
+                self.frame.index.get_level_values("key"),
+                categories=list(matches)).codes
+            self.frame = self.frame.iloc[order.argsort(kind="stable")]
+        return keys
+
+
+def get_district_rankings(session, district, mod_since=None,
+                          force_refresh=False):
     """Retrieves the team rankings based on the qualification rounds.
 
     Args:
@@ -405,12 +696,16 @@ def get_district_rankings(session, district, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
     """
     http_args = ["district", district, "rankings"]
-    df = send_request(session, http_args, "table", mod_since=mod_since)
+    df = send_request(session, http_args, "table", mod_since=mod_since,
+                      force_refresh=force_refresh)
     results = df.loc[:, ["rank", "team_key", "point_total", "rookie_bonus",
                          "event_key", "district_cmp", "total", "qual_points",
                          "alliance_points", "elim_points", "award_points"]]
@@ -418,7 +713,9 @@ def get_district_rankings(session, district, mod_since=None):
     return results
 
 
-def get_awards(session, event=None, team=None, year=None, mod_since=None):
+def get_awards(session,  # pylint: disable=too-many-arguments
+               event=None, team=None, year=None, mod_since=None,
+               force_refresh=False):
     """Retrieves awards presented at a specific event or to a team.
 
     Args:
@@ -434,6 +731,9 @@ def get_awards(session, event=None, team=None, year=None, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
 
@@ -448,10 +748,11 @@ def get_awards(session, event=None, team=None, year=None, mod_since=None):
         http_args = ["event", event, "awards"]
     else:
         raise server.ArgumentError("Incorrect Arguments")
-    return send_request(session, http_args, "table", mod_since=mod_since)
+    return send_request(session, http_args, "table", mod_since=mod_since,
+                        force_refresh=force_refresh)
 
 
-def get_alliances(session, event, mod_since=None):
+def get_alliances(session, event, mod_since=None, force_refresh=False):
     """Retrieves data for each playoff alliance.
 
     Args:
@@ -463,16 +764,32 @@ def get_alliances(session, event, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
     """
     http_args = ["event", event, "alliances"]
 
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
+    return build_alliance_frame(data)
+
+
+def build_alliance_frame(data):
+    """Converts a get_alliances() response into a dataframe.
+
+    Args:
+        data (tbap.server.Response):
+            A response with HTTP code 200.
 
-    jdata = json.loads(data["text"])
+    Returns:
+        A pandas.Dataframe object indexed by alliance name and team.
+    """
+    jdata = data.jdata
     alli_dct = collections.OrderedDict()
     alli_dct["name"] = []
     alli_dct["team"] = []
@@ -521,7 +838,7 @@ def get_alliances(session, event, mod_since=None):
     return server.attach_attributes(df, data)
 
 
-def get_insights(session, event, mod_since=None):
+def get_insights(session, event, mod_since=None, force_refresh=False):
     """
 
     Args:
@@ -533,6 +850,9 @@ def get_insights(session, event, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
@@ -540,11 +860,12 @@ def get_insights(session, event, mod_since=None):
     """
     http_args = ["event", event, "insights"]
 
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
 
-    jdata = json.loads(data["text"])
+    jdata = data.jdata
     rows = []
     for lvl in jdata.keys():
         for key, val in jdata[lvl].items():
@@ -560,9 +881,14 @@ def get_insights(session, event, mod_since=None):
     return server.attach_attributes(dframe, data)
 
 
-def get_oprs(session, event, mod_since=None):
+def get_oprs(session, event, mod_since=None, force_refresh=False):
     """Retrieves OPR, DPR, and CCWM for each team at an event.
 
+    The Blue Alliance updates these values periodically. Use
+    ``tbap.opr.compute_oprs()`` to compute them from the latest match
+    results instead, or ``tbap.opr.OprTracker`` to keep them up to date
+    as each match is scored.
+
     Args:
         session (tbap.api.Session):
             An instance of tbap.api.Session that contains
@@ -572,17 +898,33 @@ def get_oprs(session, event, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
 
     """
     http_args = ["event", event, "oprs"]
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
+    return build_opr_frame(data)
+
 
-    jdata = json.loads(data["text"])
+def build_opr_frame(data):
+    """Converts a get_oprs() response into a dataframe.
+
+    Args:
+        data (tbap.server.Response):
+            A response with HTTP code 200.
+
+    Returns:
+        A pandas.Dataframe object indexed by team.
+    """
+    jdata = data.jdata
     col_names = ["team"] + list(jdata.keys())
     cols = collections.OrderedDict([(col, []) for col in col_names])
     for team in jdata["oprs"].keys():
@@ -593,9 +935,14 @@ def get_oprs(session, event, mod_since=None):
     return server.attach_attributes(dframe, data)
 
 
-def get_predictions(session, event, mod_since=None):
+def get_predictions(session,  # pylint: disable=too-many-arguments
+                    event, mod_since=None, force_refresh=False,
+                    frames=None):
     """ Retrieves predictions regarding team performance.
 
+    The dataframes are built from the JSON response when they are
+    first accessed, so callers pay only for the dataframes they use.
+
     Args:
         session (tbap.api.Session):
             An instance of tbap.api.Session that contains
@@ -605,21 +952,86 @@ def get_predictions(session, event, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
+        frames (list):
+            The names of the dataframes to return, e.g.,
+            ["team_rankings"]. These dataframes are built immediately.
+            Optional. Default is all four dataframes, built on first
+            access.
 
     Returns:
-        A dictionary of pandas.Dataframe objects or a Python dictionary
-        object. The keys ofthe dictionary are *event_stats*,
-        *team_stats*, *predictions*, and *team_rankings*.
+        A mapping of pandas.Dataframe objects or a Python dictionary
+        object. The keys ofthe mapping are *event_stats*,
+        *team_stats*, *predictions*, and *team_rankings*, or the names
+        in *frames*.
+
+    Raises:
+        tbap.server.ArgumentError: If *frames* contains an unknown
+        name.
     """
+    if frames is not None:
+        unknown = [name for name in frames if name not in PREDICTION_FRAMES]
+        if unknown:
+            raise server.ArgumentError(
+                "Unknown prediction frames: " + ", ".join(unknown))
     http_args = ["event", event, "predictions"]
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
 
-    jdata = json.loads(data["text"])
-    frames = {key: None for key in ["stats", "matches", "teams"]}
+    if frames is None:
+        return LazyFrames(data, PREDICTION_FRAMES)
+    result = LazyFrames(data, collections.OrderedDict(
+        (name, PREDICTION_FRAMES[name]) for name in frames))
+    for name in result:
+        result[name]  # pylint: disable=pointless-statement
+    return result
+
+
+class LazyFrames(collections.abc.Mapping):
+    """A read-only dictionary of dataframes built on first access.
+
+    Attributes:
+        data: (tbap.server.Response) The response the dataframes are
+            built from.
+    """
+
+    def __init__(self, data, builders):
+        """Creates a ``LazyFrames`` object.
+
+        Args:
+            data: (tbap.server.Response)
+            builders: (dict) Functions that take the parsed JSON and
+                return a dataframe, keyed by dataframe name.
+        """
+        self.data = data
+        self._builders = builders
+        self._frames = {}
+
+    def __getitem__(self, name):
+        if name not in self._frames:
+            frame = self._builders[name](self.data.jdata)
+            self._frames[name] = server.attach_attributes(frame, self.data)
+        return self._frames[name]
 
-    # Match Prediction Stats
+    def __iter__(self):
+        return iter(self._builders)
+
+    def __len__(self):
+        return len(self._builders)
+
+    def __repr__(self):
+        return "LazyFrames({})".format(
+            ", ".join("{}{}".format(name, "" if name in self._frames
+                                    else " (not built)")
+                      for name in self._builders))
+
+
+def build_prediction_stats(jdata):
+    """Builds the *event_stats* dataframe of get_predictions()."""
     rows = []
     for lvl in jdata["match_prediction_stats"].keys():
         for key, val in jdata["match_prediction_stats"][lvl].items():
@@ -629,9 +1041,11 @@ def get_predictions(session, event, mod_since=None):
                                  "value": sub_val})
             else:
                 rows.append({"level": lvl, "statistic": key, "value": val})
-    stats_frame = pandas.DataFrame(rows).set_index(["level", "statistic"])
+    return pandas.DataFrame(rows).set_index(["level", "statistic"])
+
 
-    # Match Predictions
+def build_match_predictions(jdata):
+    """Builds the *predictions* dataframe of get_predictions()."""
     rows = []
     jdata_predictions = jdata["match_predictions"]
     for lvl in jdata_predictions.keys():
@@ -647,40 +1061,79 @@ def get_predictions(session, event, mod_since=None):
                          "statistic": "winning_alliance",
                          "value": match_data["winning_alliance"]})
 
-    prediction_frame = pandas.DataFrame(rows).set_index(["level", "match",
-                                                         "alliance",
-                                                         "statistic"])
+    return pandas.DataFrame(rows).set_index(["level", "match", "alliance",
+                                             "statistic"])
 
-    # Ranking Predictions
+
+def build_ranking_predictions(jdata):
+    """Builds the *team_rankings* dataframe of get_predictions()."""
     jdata_ranks = jdata["ranking_predictions"]
     rows = []
     for team in jdata_ranks:
         rows.append({"team": team[0], "rank": team[1][0], "points": team[1][4]})
-    rank_frame = pandas.DataFrame(rows).set_index("team")
+    return pandas.DataFrame(rows).set_index("team")
 
-    # Team Predictions
-    jdata_teams = jdata["stat_mean_vars"]
-    levels = list(jdata_teams.keys())
-    stats = list(jdata_teams[levels[0]].keys())
-    points = list(jdata_teams[levels[0]][stats[0]].keys())
-    teams = list(jdata_teams[levels[0]][stats[0]][points[0]].keys())
-    rows = []
-    for team in teams:
-        for lvl, lvl_data in jdata_teams.items():
-            for stat, stat_data in lvl_data.items():
-                for point, point_data in stat_data.items():
-                    rows.append({"team": team, "level": lvl, "statistic": stat,
-                                 "point": point, "value": point_data[team]})
-    teams_frame = pandas.DataFrame(rows).set_index(["team", "statistic",
-                                                    "point", "level"])
-
-    results = {"event_stats": stats_frame, "predictions": prediction_frame,
-               "team_rankings": rank_frame, "team_stats": teams_frame}
-    return {key: server.attach_attributes(value, data)
-            for key, value in results.items()}
 
+def build_team_stats(jdata):
+    """Builds the *team_stats* dataframe of get_predictions().
 
-def get_event_team_status(session, event, team, series=False, mod_since=None):
+    The *stat_mean_vars* section is a level x statistic x point x team
+    cube of numbers. The values are copied into a single array and the
+    index is built from integer codes, so no Python object is created
+    for each cell.
+    """
+    jdata_teams = jdata["stat_mean_vars"]
+    blocks = [(stat, point, lvl, point_data)
+              for lvl, lvl_data in jdata_teams.items()
+              for stat, stat_data in lvl_data.items()
+              for point, point_data in stat_data.items()]
+    teams = list(blocks[0][3])
+    values = numpy.array([list(point_data.values())
+                          if list(point_data) == teams
+                          else [point_data[team] for team in teams]
+                          for _, _, _, point_data in blocks],
+                         dtype="float64")
+
+    # Rows are ordered by team, then by level, statistic, and point.
+    #   Index levels are sorted, as set_index() would sort them.
+    labels = [sorted(teams)]
+    team_pos = {team: idx for idx, team in enumerate(labels[0])}
+    block_codes = []
+    for pos in range(3):
+        block_labels = [block[pos] for block in blocks]
+        labels.append(sorted(set(block_labels)))
+        label_pos = {label: idx for idx, label in enumerate(labels[-1])}
+        block_codes.append([label_pos[label] for label in block_labels])
+    # MultiIndex shrinks the codes to the smallest dtype that fits.
+    codes = [numpy.repeat(numpy.array([team_pos[team] for team in teams],
+                                      dtype="int32"), len(blocks))]
+    codes.extend(numpy.tile(numpy.array(block_codes, dtype="int32"),
+                            len(teams)))
+    labels.append(["value"])
+    # Slicing one Index is faster than creating an Index for each level
+    all_labels = pandas.Index([label for level in labels for label in level])
+    levels = []
+    start = 0
+    for level in labels:
+        levels.append(all_labels[start:start + len(level)])
+        start += len(level)
+    index = pandas.MultiIndex(levels=levels[:4], codes=codes,
+                              names=["team", "statistic", "point", "level"],
+                              verify_integrity=False)
+    return pandas.DataFrame(values.T.reshape(-1, 1), index=index,
+                            columns=levels[4])
+
+
+PREDICTION_FRAMES = collections.OrderedDict([
+    ("event_stats", build_prediction_stats),
+    ("predictions", build_match_predictions),
+    ("team_rankings", build_ranking_predictions),
+    ("team_stats", build_team_stats)])
+
+
+def get_event_team_status(session,  # pylint: disable=too-many-arguments
+                          event, team, series=False, mod_since=None,
+                          force_refresh=False):
     """Retrieves team rankings for a specific event.
 
     Args:
@@ -697,28 +1150,37 @@ def get_event_team_status(session, event, team, series=False, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
     """
     http_args = ["team", team, "event", event, "status"]
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
-    jdata = json.loads(data["text"])
+    # Copy the nested dicts that are modified below, because the parsed
+    #   JSON belongs to the response.
+    jdata = dict(data.jdata)
     if team is not None:
+        qual = dict(jdata["qual"])
         sort_order = list(map(lambda x: re.sub(" ", "_", x["name"]),
-                              jdata["qual"]["sort_order_info"]))
-        sort_data = jdata["qual"]["ranking"]["sort_orders"]
+                              qual.pop("sort_order_info")))
+        ranking = dict(qual["ranking"])
+        sort_data = ranking.pop("sort_orders")
         for idx, field in enumerate(sort_order):
-            jdata["qual"]["ranking"][field] = sort_data[idx]
-        del(jdata["qual"]["sort_order_info"])
-        del(jdata["qual"]["ranking"]["sort_orders"])
+            ranking[field] = sort_data[idx]
+        qual["ranking"] = ranking
+        jdata["qual"] = qual
         df = dframe.build_single_column(jdata, series)
         return server.attach_attributes(df, data)
 
 
-def get_event_rankings(session, event, mod_since=None):
+def get_event_rankings(session, event, mod_since=None,
+                       force_refresh=False):
     """Retrieves team rankings for a specific event.
 
     Args:
@@ -730,16 +1192,32 @@ def get_event_rankings(session, event, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A pandas.Dataframe object or a Python dictionary object.
     """
     http_args = ["event", event, "rankings"]
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
+    return build_ranking_frame(data)
+
+
+def build_ranking_frame(data):
+    """Converts a get_event_rankings() response into a dataframe.
 
-    jdata = json.loads(data["text"])
+    Args:
+        data (tbap.server.Response):
+            A response with HTTP code 200.
+
+    Returns:
+        A pandas.Dataframe object indexed by rank.
+    """
+    jdata = data.jdata
     sort_order = list(map(lambda x: x["name"], jdata["sort_order_info"]))
     extra_stats = list(map(lambda x: x["name"], jdata["extra_stats_info"]))
     rec_stat = ["wins", "losses", "ties"]
@@ -767,7 +1245,8 @@ def get_event_rankings(session, event, mod_since=None):
     return server.attach_attributes(df[sorted_cols + other_cols], data)
 
 
-def get_district_points(session, event, mod_since=None):
+def get_district_points(session, event, mod_since=None,
+                        force_refresh=False):
     """ Retrieves district points earned at an FRC competition.
 
     Args:
@@ -779,6 +1258,9 @@ def get_district_points(session, event, mod_since=None):
         mod_since (str):
             A string containing an HTTP formatted date and time.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         A dictionary of pandas.Dataframe objects or a Python dictionary
@@ -786,15 +1268,15 @@ def get_district_points(session, event, mod_since=None):
         *high_scores*.
     """
     http_args = ["event", event, "district_points"]
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
 
-    jdata = json.loads(data["text"])
+    jdata = data.jdata
 
     # District Points
-    df_points = pandas.read_json(json.dumps(jdata["points"]),
-                                 orient="index")
+    df_points = pandas.DataFrame.from_dict(jdata["points"], orient="index")
 
     # High Scores
     rows = []
@@ -812,29 +1294,33 @@ def get_district_points(session, event, mod_since=None):
             for key, value in results.items()}
 
 
-def get_media(session, team, year, mod_since=None):
+def get_media(session, team, year, mod_since=None, force_refresh=False):
     http_args = ["team", team, "media", str(year)]
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
 
-    jdata = json.loads(data["text"])
+    jdata = data.jdata
 
-    return pandas.io.json.json_normalize(jdata)
+    return pandas.json_normalize(jdata)
 
 
-def get_social_media(session, team, mod_since=None):
+def get_social_media(session, team, mod_since=None, force_refresh=False):
     http_args = ["team", team, "social_media"]
-    data = server.send_http_request(session, http_args, mod_since)
+    data = server.send_http_request(session, http_args, mod_since,
+                                    force_refresh)
     if session.data_format != "dataframe" or data["code"] != 200:
         return data
 
-    jdata = json.loads(data["text"])
+    jdata = data.jdata
 
-    return pandas.io.json.json_normalize(jdata)
+    return pandas.json_normalize(jdata)
 
 
-def send_request(session, http_args, normalize, index=None, mod_since=None):
+def send_request(session,  # pylint: disable=too-many-arguments
+                 http_args, normalize, index=None, mod_since=None,
+                 force_refresh=False):
     """Routes data request to correct internal functions.
 
     Args:
@@ -852,20 +1338,41 @@ def send_request(session, http_args, normalize, index=None, mod_since=None):
             Causes function to return None if no changes have been
             made to the requested data since the date and time provided.
             Optional.
+        force_refresh (bool):
+            If True, the request is sent to the server even if the
+            session's memory cache holds a fresh response. Optional.
 
     Returns:
         Either a pandas.Dataframe object (if session.data_format =
         "dataframe") or a Python dictionary.
 
     """
-    http_response = server.send_http_request(session, http_args, mod_since)
+    http_response = server.send_http_request(session, http_args, mod_since,
+                                             force_refresh)
     if session.data_format != "dataframe" or http_response["code"] != 200:
         return http_response
-    else:
-        if normalize == "table":
-            frame = dframe.build_table(http_response)
-        elif normalize == "single_column":
-            frame = dframe.build_single_column(http_response["text"])
+    return build_frame(http_response, normalize, index)
+
+
+def build_frame(http_response, normalize, index=None):
+    """Converts a response from the TBA server into a dataframe.
+
+    Args:
+        http_response (tbap.server.Response):
+            A response with HTTP code 200.
+        normalize (str):
+            Either "table" or "single_column". See send_request().
+        index (str):
+            The column to use as the dataframe index, if present.
+            Optional.
+
+    Returns:
+        A pandas.Dataframe object.
+    """
+    if normalize == "table":
+        frame = dframe.build_table(http_response)
+    elif normalize == "single_column":
+        frame = dframe.build_single_column(http_response.jdata)
     if index is not None:
         try:
             frame.set_index(index, inplace=True)
@@ -874,6 +1381,52 @@ def send_request(session, http_args, normalize, index=None, mod_since=None):
     return server.attach_attributes(frame, http_response)
 
 
+def fetch_many(session, calls, max_workers=8, rate_limit=None):
+    """Calls several tbap functions concurrently on a thread pool.
+
+    Example::
+
+        calls = [(api.get_matches, {"team": team, "year": 2017})
+                 for team in ["frc1318", "frc2046", "frc4911"]]
+        frames = api.fetch_many(sn, calls, max_workers=4)
+
+    Args:
+        session (tbap.api.Session):
+            An instance of tbap.api.Session that contains
+            a valid username and authorization key.
+        calls (list):
+            A list of (function, kwargs) tuples, where *function* is a
+            tbap.api function such as ``get_matches`` and *kwargs* is
+            a dictionary of keyword arguments for that function. The
+            session argument is supplied by fetch_many().
+        max_workers (int):
+            The number of threads. Optional. Default is 8. The number
+            of requests in flight is also limited by
+            *session.max_concurrency*.
+        rate_limit (int or float):
+            The maximum number of calls that are started per second.
+            Optional. Default is no limit. All requests are also
+            subject to *session.rate_limiter*.
+
+    Returns:
+        A list containing the result of each call, in the same order as
+        *calls*.
+
+    Raises:
+        Any exception raised by one of the calls.
+    """
+    limiter = server.TokenBucket(rate_limit) if rate_limit else None
+
+    def run(call):
+        func, kwargs = call
+        if limiter is not None:
+            limiter.acquire()
+        return func(session, **kwargs)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        return list(executor.map(run, calls))
+
+
 # noinspection PyAttributeOutsideInit
 class Session:
     """Contains information required for every TBA Read API HTTP request.
@@ -908,6 +1461,42 @@ class Session:
             Other common time zone settings are "America/New_York",
             "America/Chicago", "America/Denver", "America/Alaska",
             and "America/Hawaii".
+        pool: (tbap.server.ConnectionPool)
+            The keep-alive connection pool shared by all tbap functions
+            that are called with this session.
+        handshakes: (int)
+            The number of new connections that have been opened to the
+            Blue Alliance server. Read only.
+        max_concurrency: (int)
+            The maximum number of HTTP requests that can be in flight
+            at once across all threads using this session. Read only.
+        cache: (tbap.server.ResponseCache)
+            The persistent response cache, or None if responses are not
+            cached. Cached responses are revalidated with the server
+            before use.
+        memory_cache: (tbap.server.MemoryCache)
+            The in-memory cache of responses that are still fresh
+            according to their *Cache-Control* header, or None.
+        cache_hits: (int)
+            The number of requests answered from the memory cache.
+            Read only.
+        cache_misses: (int)
+            The number of requests that could not be answered from the
+            memory cache. Read only.
+        rate_limiter: (tbap.server.TokenBucket)
+            The token bucket that limits the request rate, or None.
+        max_retries: (int)
+            The number of times a failed request is retried.
+        backoff: (float)
+            The maximum delay in seconds before the first retry.
+        max_backoff: (float)
+            The longest delay in seconds before a retry.
+        endpoint_stats: (dict)
+            The number of requests, retries, and failures for each TBA
+            endpoint, e.g., {"event/*/rankings": {"requests": 12,
+            "retries": 1, "failures": 0}}. Read only.
+        flights: (tbap.server.SingleFlight)
+            Coalesces concurrent identical requests, or None.
 
     Class Attributes:
         TBA_URL: (str)
@@ -929,8 +1518,12 @@ class Session:
     USER_AGENT_NAME = "tbap: Version" + PACKAGE_VERSION
     DEFAULT_TIME_ZONE = "America/Los_Angeles"
 
-    def __init__(self, username, key, data_format="dataframe",
-                 time_zone=DEFAULT_TIME_ZONE):
+    def __init__(self, username, key,  # pylint: disable=too-many-arguments
+                 data_format="dataframe", time_zone=DEFAULT_TIME_ZONE,
+                 pool_size=4, idle_timeout=60, max_concurrency=8,
+                 cache=None, memory_cache=None, rate_limit=None, burst=1,
+                 max_retries=3, backoff=0.5, max_backoff=60,
+                 coalesce=True):
         """Creates a ``Session`` object.
 
         Args:
@@ -944,13 +1537,106 @@ class Session:
             time_zone: (pytz timezone object)
                 Times in Pandas dataframes will be converted to this
                 timezone. Optional. Default is "America/Los_Angeles".
-                username: (str)
+            pool_size: (int)
+                The maximum number of idle connections kept open for
+                reuse. Optional. Default is 4.
+            idle_timeout: (int or float)
+                Idle connections are closed after this number of
+                seconds. Optional. Default is 60.
+            max_concurrency: (int)
+                The maximum number of concurrent HTTP requests.
+                Optional. Default is 8.
+            cache: (str or tbap.server.ResponseCache)
+                The path of an SQLite file in which responses will be
+                cached, or a ResponseCache object. Optional. Default is
+                None (no cache). A cache created from a path is closed
+                by ``Session.close()``.
+            memory_cache: (int)
+                The maximum number of bytes of JSON text kept in the
+                in-memory cache of fresh responses. Optional. Default
+                is None (no memory cache).
+            rate_limit: (int or float)
+                The maximum average number of requests per second,
+                shared by all threads using this session. Optional.
+                Default is None (no limit).
+            burst: (int)
+                The number of requests that may be sent at once before
+                *rate_limit* applies. Optional. Default is 1.
+            max_retries: (int)
+                The number of times a request is retried after a
+                connection error or an HTTP 429, 500, 502, 503, or 504
+                reply. Optional. Default is 3.
+            backoff: (int or float)
+                The maximum delay in seconds before the first retry.
+                The maximum doubles with each retry and the actual
+                delay is chosen at random, unless the server sends a
+                *Retry-After* header. Optional. Default is 0.5.
+            max_backoff: (int or float)
+                The longest delay in seconds before a retry. Optional.
+                Default is 60.
+            coalesce: (bool)
+                If True, concurrent identical requests from different
+                threads share a single HTTP request and parsed
+                response. Optional. Default is True.
         """
 
         self.username = username
         self.key = key
         self.data_format = data_format
         self.time_zone = time_zone
+        self.pool = server.ConnectionPool(self.TBA_URL, pool_size,
+                                          idle_timeout)
+        self._max_concurrency = max_concurrency
+        self.request_slots = threading.BoundedSemaphore(max_concurrency)
+        self._owns_cache = isinstance(cache, str)
+        if self._owns_cache:
+            cache = server.ResponseCache(cache)
+        self.cache = cache
+        self.memory_cache = (None if memory_cache is None
+                             else server.MemoryCache(memory_cache))
+        self.rate_limiter = (None if rate_limit is None
+                             else server.TokenBucket(rate_limit, burst))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.request_stats = server.RequestStats()
+        self.flights = server.SingleFlight() if coalesce else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes all idle connections to the Blue Alliance server."""
+        self.pool.close()
+        if self._owns_cache:
+            self.cache.close()
+
+    @property
+    def handshakes(self):
+        return self.pool.handshakes
+
+    @property
+    def cache_hits(self):
+        if self.memory_cache is None:
+            return 0
+        return self.memory_cache.hits
+
+    @property
+    def cache_misses(self):
+        if self.memory_cache is None:
+            return 0
+        return self.memory_cache.misses
+
+    @property
+    def endpoint_stats(self):
+        return self.request_stats.to_dict()
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
 
     @property
     def key(self):
@@ -1,90 +1,489 @@
-import json
-import re
+import collections
+import operator
 
 import pandas
-from pandas.io import json as pj
+
+import tbap.server as server
+
+
+# Labels of previously flattened keys, keyed by (prefix, key).
+LABELS = {}
+
+
+def label(prefix, key):
+    """Returns the label of *key* below *prefix*, with spaces replaced
+    by underscores.
+
+    TBA status objects use the same keys in every response, so labels
+    are built once and then looked up.
+    """
+    try:
+        return LABELS[(prefix, key)]
+    except KeyError:
+        if len(LABELS) > 10000:
+            LABELS.clear()
+        result = LABELS[(prefix, key)] = prefix + str(key).replace(" ", "_")
+        return result
 
 
 def build_single_column(data, series=False):
-    jdata = json.loads(data) if isinstance(data, str) else data
-    rows = []
+    """Flattens a nested JSON object into a single column.
 
-    def append_scaler(key, val):
-        key = re.sub(" ", "_", key)  # Replace spaces with underscores in keys.
-        if isinstance(val, dict):
-            if not val:
-                rows.append({"label": key, "value": None})
-            else:
-                for subkey, subval in val.items():
-                    append_scaler(key + "_" + subkey, subval)
-        elif isinstance(val, list):
-            if not val:
-                rows.append({"label": key, "value": None})
-            else:
-                for idx, item in enumerate(val):
-                    append_scaler(key + "_" + str(idx), item)
-        else:
-            rows.append({"label": key, "value": val})
+    Each scalar value is labeled with the keys (or list positions) on
+    the path to it, joined with underscores. Empty objects and lists
+    are labeled with their own key and have a value of None. The
+    object is walked with a stack of iterators rather than recursion,
+    and the labels and values are collected in two lists.
+
+    Args:
+        data: (dict or str) A JSON object or its text.
+        series: (bool) Optional. If True, returns a pandas.Series.
 
-    for top_key, top_val in jdata.items():
-        append_scaler(top_key, top_val)
+    Returns:
+        A pandas.Series indexed by label, or a pandas.DataFrame indexed
+        by *label* with a single *value* column.
+    """
+    jdata = server.json_loads(data) if isinstance(data, str) else data
+    labels = []
+    values = []
+    stack = [("", iter(jdata.items()))]
+    while stack:
+        prefix, items = stack[-1]
+        for key, val in items:
+            key_label = label(prefix, key)
+            if val and isinstance(val, dict):
+                stack.append((key_label + "_", iter(val.items())))
+                break
+            if val and isinstance(val, list):
+                stack.append((key_label + "_", enumerate(val)))
+                break
+            labels.append(key_label)
+            values.append(None if isinstance(val, (dict, list)) else val)
+        else:
+            stack.pop()
 
     if series:
-        s_list = [(x["label"], x["value"]) for x in rows]
-        return pandas.Series(map(lambda x: x[1], s_list),
-                             index=map(lambda x: x[0], s_list))
+        return pandas.Series(values, index=labels)
     else:
-        return pandas.DataFrame(rows).set_index(["label"])
+        return pandas.DataFrame({"value": values},
+                                index=pandas.Index(labels, name="label"))
+
+
+class SchemaMismatch(Exception):
+    """Raised when a JSON object does not have the expected structure."""
+
+
+class Schema(object):
+    """Describes the keys of a JSON object and of its nested objects.
+
+    A Schema is derived from one or more JSON objects. Values that are
+    not dictionaries become columns (leaves), and dictionaries become
+    child schemas whose columns are named "key.subkey". As in
+    ``pandas.json_normalize()``, the leaf columns come first, followed
+    by the columns of each child. A key that is sometimes a dictionary
+    and sometimes another value is both a leaf and a child.
+
+    Each schema has two ways of extracting a row of values:
+    strict_row() is fast but raises SchemaMismatch unless the object
+    has exactly the schema's keys, and tolerant_row() accepts any
+    object whose keys and value types are known to the schema.
+    """
+
+    def __init__(self):
+        self.keys = []  # All keys, in order of first appearance
+        self.leaves = []
+        self.children = {}
+        # Leaves whose values have only been None; they may be dicts.
+        self.untyped = set()
+        self.tolerant = False
+        self._compile()
+
+    @classmethod
+    def from_records(cls, records):
+        """Creates a schema that describes all *records*."""
+        schema = cls()
+        for record in records:
+            schema._merge(record)  # pylint: disable=protected-access
+        schema._compile()  # pylint: disable=protected-access
+        return schema
+
+    def merge(self, record):
+        """Adds the keys of a JSON object to the schema."""
+        self._merge(record)
+        self._compile()
+        return self
+
+    def _merge(self, record):
+        for key, val in record.items():
+            if key not in self._keyset:
+                self._keyset.add(key)
+                self.keys.append(key)
+            if isinstance(val, dict):
+                child = self.children.get(key)
+                if child is None:
+                    child = self.children[key] = Schema()
+                    if key in self.untyped:
+                        self.leaves.remove(key)
+                        self.untyped.discard(key)
+                child._merge(val)  # pylint: disable=protected-access
+            elif val is None:
+                if key not in self.children and key not in self.leaves:
+                    self.leaves.append(key)
+                    self.untyped.add(key)
+            elif key in self.untyped:
+                self.untyped.discard(key)
+            elif key not in self.leaves:
+                self.leaves.append(key)
+
+    def _compile(self):
+        for child in self.children.values():
+            child._compile()  # pylint: disable=protected-access
+        # Positions of the leaves that are also children
+        self._mixed = [idx for idx, key in enumerate(self.leaves)
+                       if key in self.children]
+        self.tolerant = self.tolerant or bool(self._mixed)
+        self._keyset = set(self.keys)
+        self._leafset = set(self.leaves)
+        self._untyped = [key for key in self.leaves if key in self.untyped]
+        self._children = [(key, self.children[key]) for key in self.keys
+                          if key in self.children]
+        if len(self.leaves) == 1:
+            key = self.leaves[0]
+            self._getter = lambda record: (record[key],)
+        elif self.leaves:
+            self._getter = operator.itemgetter(*self.leaves)
+        else:
+            self._getter = lambda record: ()
+        self.nones = (None,) * len(self.columns())
+
+    def columns(self, prefix=""):
+        """Returns the column names in the order of the row values."""
+        cols = [prefix + key for key in self.leaves]
+        for key, child in self._children:
+            cols.extend(child.columns(prefix + key + "."))
+        return cols
+
+    def strict_row(self, record):
+        """Returns the values of an object with exactly the schema's keys."""
+        if len(record) != len(self.keys):
+            raise SchemaMismatch()
+        try:
+            row = self._getter(record)
+            for key, child in self._children:
+                val = record[key]
+                if val.__class__ is dict:
+                    row += child.strict_row(val)
+                elif val is None:
+                    row += child.nones
+                else:
+                    raise SchemaMismatch()
+        except KeyError:
+            raise SchemaMismatch()
+        return row
+
+    def tolerant_row(self, record):
+        """Returns the values of an object, using None for missing keys.
+
+        Raises SchemaMismatch if the object has a key the schema does
+        not know, a value for a leaf that has only been None, or a
+        value other than an object or None for a child.
+        """
+        if not record.keys() <= self._keyset:
+            raise SchemaMismatch()
+        for key in self._untyped:
+            if record.get(key) is not None:
+                raise SchemaMismatch()
+        if len(record) == len(self._keyset):
+            row = self._getter(record)
+        else:
+            row = tuple(map(record.get, self.leaves))
+        if self._mixed:
+            # The objects of mixed keys are in the child's columns.
+            row = list(row)
+            for idx in self._mixed:
+                if isinstance(row[idx], dict):
+                    row[idx] = None
+            row = tuple(row)
+        for key, child in self._children:
+            val = record.get(key)
+            if val.__class__ is dict:
+                row += child.tolerant_row(val)
+            elif val is None or key in self._leafset:
+                row += child.nones
+            else:
+                raise SchemaMismatch()
+        return row
+
+
+def flatten_records(records):
+    """Converts a list of JSON objects into a dataframe.
+
+    Nested objects are flattened into columns named "key.subkey".
+    Lists are stored in a single column. The structure of the objects
+    is described by a Schema, which is derived from the first object.
+    As long as all objects have that structure, each row is extracted
+    with ``operator.itemgetter``. Otherwise the rows are extracted
+    again by learn_columns(), with missing values set to None.
 
+    Args:
+        records: (list) Dictionaries parsed from TBA JSON.
 
-def build_table(response):
-    jtxt = response["text"]
-    jdata = json.loads(jtxt)
-    scaler_cols = []
-    dict_cols = []
-    list_cols = []
+    Returns:
+        A pandas.DataFrame object.
+    """
+    if not records:
+        return pandas.DataFrame()
+    schema = Schema().merge(records[0])
+    columns = extract_columns(schema, records)
+    if columns is None:
+        schema, columns = learn_columns(records)
+    if columns is None:
+        # A key is an object in some records and a value in others.
+        schema = Schema.from_records(records)
+        schema.tolerant = True
+        columns = extract_columns(schema, records)
+
+    return pandas.DataFrame(collections.OrderedDict(
+        (col, list(values)) for col, values in zip(schema.columns(),
+                                                    columns)))
+
+
+def learn_columns(records):
+    """Extracts the column values of objects with varying structure.
+
+    The schema starts from the first object and is extended whenever
+    an object does not fit it, so the objects are read only once.
+    Rows extracted before the schema was extended are then rearranged
+    to match its final columns.
+
+    Args:
+        records: (list) Dictionaries parsed from TBA JSON.
+
+    Returns:
+        A tuple containing the schema and a list of column values, or
+        (None, None) if the rows cannot be extracted with a single
+        schema.
+    """
+    schema = Schema().merge(records[0])
+    schema.tolerant = True
+    rows = []
+    # (index of first row, columns) for each version of the schema
+    versions = [(0, schema.columns())]
+    for record in records:
+        try:
+            rows.append(schema.tolerant_row(record))
+        except SchemaMismatch:
+            schema.merge(record)
+            versions.append((len(rows), schema.columns()))
+            rows.append(schema.tolerant_row(record))
+
+    final = versions[-1][1]
+    ends = [start for start, _ in versions[1:]] + [len(rows)]
+    for (start, cols), end in zip(versions, ends):
+        if cols == final:
+            continue
+        positions = {col: idx for idx, col in enumerate(cols)}
+        order = [positions.get(col) for col in final]
+        rows[start:end] = [
+            tuple(None if idx is None else row[idx] for idx in order)
+            for row in rows[start:end]]
+    columns = list(zip(*rows))
+    if has_objects(columns):
+        return None, None
+    return schema, columns
+
+
+def extract_columns(schema, records):
+    """Returns the column values of *records*, or None if they do not
+    match *schema*.
+
+    A dictionary in a column means that a value the schema treats as
+    a leaf is an object in some records, so the columns are checked
+    for dictionaries once, rather than every value being checked as
+    it is extracted.
+    """
+    row = schema.tolerant_row if schema.tolerant else schema.strict_row
+    try:
+        columns = list(zip(*[row(record) for record in records]))
+    except SchemaMismatch:
+        return None
+    if has_objects(columns):
+        return None
+    return columns
+
+
+def has_objects(columns):
+    """Returns True if any column contains a dictionary."""
+    return any(dict in set(map(type, values)) for values in columns)
+
+
+def build_table(data):
+    jdata = data.jdata if isinstance(data, server.Response) else data
 
     # Pandas functions throw error if json is single dict object.
     if isinstance(jdata, dict):
         jdata = [jdata]
-        jtxt = "[" + jtxt + "]"
+    if not jdata:
+        return pandas.DataFrame()
 
     if isinstance(jdata[0], dict):
+        scaler_cols = []
+        list_cols = []
         for key, var in jdata[0].items():
-            if isinstance(var, dict):
-                dict_cols.append(key)
-            elif isinstance(var, list):
+            if isinstance(var, list):
                 list_cols.append(key)
-            else:
+            elif not isinstance(var, dict):
                 scaler_cols.append(key)
+        if len(list_cols) == 1:
+            return pandas.json_normalize(jdata, record_path=list_cols,
+                                         meta=scaler_cols)
+        return flatten_records(jdata)
 
-    if len(list_cols) == 1:
-        dframe = pj.json_normalize(jdata, record_path=list_cols,
-                                   meta=scaler_cols)
-    elif len(dict_cols) > 0:
-        dframe = pj.json_normalize(jdata)
-        for val in dict_cols:
-            if val in dframe.columns:
-                dframe.drop(val, axis=1, inplace=True)
-    elif not scaler_cols and not list_cols:
-        dframe = pandas.read_json(jtxt)
-    else:
-        dframe = pandas.read_json(jtxt, orient="records")
+    return pandas.DataFrame(jdata)
 
-    return dframe
 
+def expand_column(dframe, col_name, dtypes=None):
+    """Replaces a column of JSON objects with one column per key.
+
+    The sub-columns are named *col_name* + "_" + key and are appended
+    to the dataframe. The keys are the union of the keys of all
+    objects in the column, in order of first appearance, and are
+    collected in a single pass over the column. Rows whose object
+    lacks a key, or whose value is not an object, get None.
 
-def expand_column(dframe, col_name):
-    def get_val(cell):
-        return cell.get(key) if isinstance(cell, dict) else None
+    Args:
+        dframe: (pandas.DataFrame) Modified in place.
+        col_name: (str) The column to expand. If the dataframe has no
+            such column, or the column contains no objects, the
+            dataframe is returned unchanged.
+        dtypes: (dict or dtype) Optional. The types of the
+            sub-columns, either a dict keyed by JSON key or a single
+            type for all sub-columns. By default pandas infers them.
 
-    if col_name in dframe:
-        col_dframe = dframe.dropna(subset=[col_name])
-        if col_dframe.shape[0] > 0:
-            for key in col_dframe[col_name][0].keys():
-                sub_col_name = col_name + "_" + key
-                dframe[sub_col_name] = list(map(get_val, dframe[col_name]))
-            dframe.drop(col_name, axis=1, inplace=True)
+    Returns:
+        The modified dataframe.
+    """
+    if col_name not in dframe:
+        return dframe
+    cells = dframe[col_name].tolist()
+    columns = collections.OrderedDict()
+    for idx, cell in enumerate(cells):
+        if isinstance(cell, dict):
+            for key, val in cell.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * len(cells)
+                column[idx] = val
+    if not columns:
+        return dframe
+
+    # Converting each column as it is built is faster than inferring
+    #   its type and converting it afterwards.
+    if not isinstance(dtypes, dict):
+        dtypes = dict.fromkeys(columns, dtypes)
+    sub_frame = pandas.DataFrame(collections.OrderedDict(
+        (col_name + "_" + str(key),
+         pandas.Series(values, index=dframe.index, dtype=dtypes.get(key)))
+        for key, values in columns.items()))
+    dframe.drop(col_name, axis=1, inplace=True)
+    dframe[sub_frame.columns] = sub_frame
     return dframe
 
 
+def build_match_table(jdata):
+    """Flattens a list of TBA match objects into a dataframe.
+
+    The dataframe has one row for each team in each match, in the
+    order blue teams, blue surrogate teams, red teams, red surrogate
+    teams. Each row contains the team's key, alliance, surrogate and
+    disqualification status, the alliance score, all scalar values of
+    the match, and the alliance's score breakdown.
+
+    Values that are the same for all teams on an alliance are stored
+    once per alliance in a column list and then repeated for each team
+    when the dataframe is built, rather than building a dictionary for
+    every row.
+
+    Args:
+        jdata: (list) Match objects parsed from TBA JSON.
+
+    Returns:
+        A pandas.DataFrame object. Values that are missing from some
+        matches are NaN.
+    """
+    # Each block is a group of rows that share all values except the
+    #   team key and disqualification status.
+    blocks = [(mtch, alliance, surrogate)
+              for mtch in jdata for alliance in ["blue", "red"]
+              for surrogate in [False, True]
+              if mtch["alliances"][alliance][
+                  "surrogate_team_keys" if surrogate else "team_keys"]]
+    if not blocks:
+        return pandas.DataFrame()
+    nan = float("nan")
+    team_keys = []
+    disqualified = []
+    counts = []
+    columns = collections.OrderedDict(
+        (col, [nan] * len(blocks)) for col in
+        ["team_key", "alliance", "surrogate", "score", "disqualified"])
+
+    prev_mtch = None
+    for idx, (mtch, alliance, surrogate) in enumerate(blocks):
+        alli_data = mtch["alliances"][alliance]
+        teams = alli_data["surrogate_team_keys" if surrogate else "team_keys"]
+        team_keys.extend(teams)
+        disqualified.extend([team in alli_data["dq_team_keys"]
+                             for team in teams])
+        counts.append(len(teams))
+        if mtch is not prev_mtch:
+            scalars = [(key, val) for key, val in mtch.items()
+                       if not isinstance(val, (list, dict))
+                       and key != "score_breakdown"]
+            breakdown = mtch.get("score_breakdown") or {}
+            prev_mtch = mtch
+        row = [("alliance", alliance), ("surrogate", surrogate),
+               ("score", alli_data["score"])]
+        for items in [row, scalars, breakdown.get(alliance, {}).items()]:
+            for col, val in items:
+                column = columns.get(col)
+                if column is None:
+                    column = columns[col] = [nan] * len(blocks)
+                column[idx] = val
+
+    frame_data = collections.OrderedDict()
+    for col, values in columns.items():
+        if col == "team_key":
+            frame_data[col] = team_keys
+        elif col == "disqualified":
+            frame_data[col] = disqualified
+        else:
+            frame_data[col] = pandas.Series(values).repeat(counts).values
+    return pandas.DataFrame(frame_data)
+
+
+def convert_times(dframe, time_zone):
+    """Converts epoch time columns to timezone-aware timestamps.
+
+    All columns whose names end in "time" are converted together: the
+    columns are stacked into a single array of epoch seconds, which is
+    converted to UTC timestamps and then to *time_zone* in one
+    operation. Missing values become NaT.
+
+    Args:
+        dframe: (pandas.DataFrame) Modified in place.
+        time_zone: (pytz timezone object)
+
+    Returns:
+        The modified dataframe.
+    """
+    cols = [col for col in dframe.columns if str(col).endswith("time")]
+    if not cols or dframe.shape[0] == 0:
+        return dframe
+    seconds = dframe[cols].to_numpy(dtype="float64").ravel(order="F")
+    times = pandas.to_datetime(seconds, unit="s", utc=True)
+    times = times.tz_convert(time_zone)
+    nrows = dframe.shape[0]
+    for idx, col in enumerate(cols):
+        dframe[col] = times[idx * nrows:(idx + 1) * nrows]
+    return dframe
@@ -0,0 +1,226 @@
+"""Polls event data during a live competition and reports changes.
+
+A ``Poller`` keeps a list of watched resources, such as the matches or
+rankings of an event, and requests each resource with the
+*If-Modified-Since* header set to the *Last-Modified* value of the
+previous response. Only responses that contain new data are converted
+to dataframes and passed to the watch's callback::
+
+    def show_rankings(watch, rankings):
+        print(rankings.head(8))
+
+    poller = live.Poller(api.Session("username", "key"))
+    poller.watch("2017pncmp", "rankings", show_rankings)
+    poller.start()
+
+Each watch has its own polling interval. The interval shrinks each
+time the resource changes and grows each time the server reports that
+it has not changed, within the poller's *min_interval* and
+*max_interval*. A resource is never polled more often than its
+*Cache-Control: max-age* header allows, because the server would only
+repeat the same response.
+"""
+import threading
+import time
+import warnings
+
+import tbap.api as api
+import tbap.server as server
+
+
+# Functions that convert a response into a dataframe, keyed by the
+#   last segment of the TBA URL.
+BUILDERS = {
+    "matches": api.build_match_frame,
+    "rankings": lambda session, data: api.build_ranking_frame(data),
+    "alliances": lambda session, data: api.build_alliance_frame(data),
+    "oprs": lambda session, data: api.build_opr_frame(data)
+}
+
+
+class Watch(object):
+    """A resource watched by a Poller.
+
+    Attributes:
+        event: (str) The event key, e.g., "2017pncmp".
+        resource: (str) Either "matches", "rankings", "alliances", or
+            "oprs".
+        callback: (function) Called as ``callback(watch, data)`` with a
+            dataframe, or with a tbap.server.Response if the session's
+            data format is "json".
+        interval: (float) The current polling interval in seconds.
+        max_age: (int) The *max-age* value of the last response.
+        last_modified: (str) The *Last-Modified* value of the last
+            response that contained data.
+        next_poll: (float) The time.monotonic() value at which the
+            resource is next due.
+        polls: (int) The number of requests sent.
+        changes: (int) The number of times the callback was called.
+        last_error: (str) The error message of the last failed request,
+            or None.
+        last_text: (str) The JSON text of the last response that
+            contained data, or None.
+    """
+
+    def __init__(self, event, resource, callback, interval):
+        self.event = event
+        self.resource = resource
+        self.callback = callback
+        self.interval = interval
+        self.max_age = 0
+        self.last_modified = None
+        self.next_poll = 0
+        self.polls = 0
+        self.changes = 0
+        self.last_error = None
+        self.last_text = None
+
+    @property
+    def args(self):
+        return ["event", self.event, self.resource]
+
+
+class Poller(object):
+    """Polls watched resources at intervals that adapt to their changes.
+
+    Attributes:
+        session: (tbap.api.Session)
+        min_interval: (float) The shortest polling interval in seconds.
+        max_interval: (float) The longest polling interval in seconds.
+        speedup: (float) The interval is multiplied by this factor each
+            time the resource changes.
+        slowdown: (float) The interval is multiplied by this factor each
+            time the resource has not changed or the request fails.
+        watches: (list) The tbap.live.Watch objects.
+    """
+
+    def __init__(self, session,  # pylint: disable=too-many-arguments
+                 min_interval=10, max_interval=300, speedup=0.5,
+                 slowdown=1.5):
+        self.session = session
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.speedup = speedup
+        self.slowdown = slowdown
+        self.watches = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, event, resource, callback, interval=None):
+        """Adds a resource to the poller. It is due immediately.
+
+        Args:
+            event: (str) The event key, e.g., "2017pncmp".
+            resource: (str) Either "matches", "rankings", "alliances",
+                or "oprs".
+            callback: (function) Called as ``callback(watch, data)``
+                when the resource changes.
+            interval: (float) The initial polling interval in seconds.
+                Optional. Default is *min_interval*.
+
+        Returns:
+            A tbap.live.Watch object.
+
+        Raises:
+            tbap.server.ArgumentError: If *resource* is not supported.
+        """
+        if resource not in BUILDERS:
+            raise server.ArgumentError(
+                "resource must be one of " + ", ".join(sorted(BUILDERS)))
+        watch = Watch(event, resource, callback,
+                      self.min_interval if interval is None else interval)
+        with self._lock:
+            self.watches.append(watch)
+        return watch
+
+    def unwatch(self, watch):
+        """Removes a watch from the poller."""
+        with self._lock:
+            self.watches.remove(watch)
+
+    def poll(self, watch):
+        """Requests a resource and calls its callback if it changed.
+
+        Returns:
+            True if the resource changed, otherwise False.
+        """
+        data = server.send_http_request(self.session, watch.args,
+                                        watch.last_modified)
+        watch.polls += 1
+        changed = False
+        if data["code"] == 200:
+            watch.last_error = None
+            watch.max_age = server.cache_max_age(data)
+            watch.last_modified = data.get("Last-Modified")
+            # Some responses are sent again without a 304 even though
+            #   their content has not changed.
+            changed = data["text"] != watch.last_text
+            watch.last_text = data["text"]
+        elif data["code"] != 304:
+            watch.last_error = data.get("error_message")
+
+        if changed:
+            watch.interval = max(self.min_interval,
+                                 watch.interval * self.speedup)
+        else:
+            watch.interval = min(self.max_interval,
+                                 watch.interval * self.slowdown)
+        watch.next_poll = time.monotonic() + max(watch.interval,
+                                                 watch.max_age)
+        if changed:
+            watch.changes += 1
+            if self.session.data_format == "dataframe":
+                data = BUILDERS[watch.resource](self.session, data)
+            watch.callback(watch, data)
+        return changed
+
+    def poll_due(self):
+        """Polls every watch that is due.
+
+        An exception raised while polling a watch, including one raised
+        by its callback, is issued as a warning so the remaining watches
+        are still polled.
+
+        Returns:
+            The list of watches that changed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [watch for watch in self.watches if watch.next_poll <= now]
+        changed = []
+        for watch in due:
+            try:
+                if self.poll(watch):
+                    changed.append(watch)
+            except Exception as err:  # pylint: disable=broad-except
+                warnings.warn("Poller error in {} {}: {}".format(
+                    watch.event, watch.resource, err))
+                # Don't poll the watch again right away if it failed
+                #   before its next poll time was set.
+                if watch.next_poll <= now:
+                    watch.next_poll = time.monotonic() + watch.interval
+        return changed
+
+    def run(self):
+        """Polls due watches until stop() is called."""
+        while not self._stop.is_set():
+            self.poll_due()
+            with self._lock:
+                next_poll = min([watch.next_poll for watch in self.watches],
+                                default=time.monotonic() + self.min_interval)
+            self._stop.wait(max(next_poll - time.monotonic(), 0))
+
+    def start(self):
+        """Runs the poller on a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True,
+                                        name="tbap-poller")
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background thread started by start()."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
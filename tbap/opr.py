@@ -0,0 +1,347 @@
+"""Computes offensive power ratings from match results.
+
+The Blue Alliance computes OPR, DPR, and CCWM on its server, but the
+values are only updated periodically during an event. The functions
+in this module compute the same statistics locally from the dataframe
+returned by ``tbap.api.get_matches()``, so they can be recomputed as
+soon as each match is scored::
+
+    matches = api.get_matches(session, event="2017pncmp")
+    oprs = opr.compute_oprs(matches)
+
+OPR is the least squares solution of *A x = s*, where each row of the
+incidence matrix *A* is an alliance in a qualification match, each
+column is a team, *A[i, j]* is 1 if team *j* played on alliance *i*,
+and *s* contains the alliance scores. DPR is the solution for the
+opposing alliance's scores, and CCWM is OPR - DPR. Only
+qualification matches that have been played are used.
+
+Component OPRs apply the same calculation to the columns of the score
+breakdown, such as *autoPoints* or *teleopRotorPoints*.
+"""
+import collections
+
+import numpy
+import pandas
+
+
+def qualification_rows(matches):
+    """Returns the rows of played qualification matches.
+
+    Args:
+        matches: (pandas.DataFrame) A dataframe returned by
+            ``tbap.api.get_matches()``.
+
+    Returns:
+        A pandas.DataFrame with *key* and *team_key* columns and one
+        row for each team on each alliance.
+    """
+    if "team_key" not in matches.columns:
+        matches = matches.reset_index()
+    # Surrogate teams also appear in team_keys, so the surrogate rows
+    #   would count them twice.
+    return matches[(matches["comp_level"] == "qm") &
+                   ~matches["surrogate"].astype(bool) &
+                   (matches["score"] >= 0)]
+
+
+def build_incidence(matches):
+    """Builds the alliance-team incidence matrix for a match dataframe.
+
+    Args:
+        matches: (pandas.DataFrame) A dataframe returned by
+            ``tbap.api.get_matches()``, indexed by match key and team
+            key, or a dataframe with *key* and *team_key* columns.
+
+    Returns:
+        A tuple containing the incidence matrix (a numpy.ndarray with
+        one row per alliance and one column per team), an index of the
+        team keys in column order, and a dataframe with the first row
+        of each alliance, in row order.
+    """
+    rows = qualification_rows(matches)
+    alliance_codes, _ = pandas.factorize(rows["key"] + " " + rows["alliance"])
+    team_codes, teams = pandas.factorize(rows["team_key"], sort=True)
+    first = numpy.unique(alliance_codes, return_index=True)[1]
+    incidence = numpy.zeros((len(first), len(teams)))
+    incidence[alliance_codes, team_codes] = 1
+    return incidence, pandas.Index(teams, name="team"), rows.iloc[first]
+
+
+def opponent_scores(alliances):
+    """Returns the opposing alliance's score for each alliance.
+
+    Args:
+        alliances: (pandas.DataFrame) One row per alliance, as returned
+            by build_incidence().
+
+    Returns:
+        A numpy.ndarray of scores. Alliances whose opponent did not
+        score are NaN.
+    """
+    scores = alliances.set_index(["key", "alliance"])["score"]
+    opponents = pandas.MultiIndex.from_arrays(
+        [alliances["key"], alliances["alliance"].map({"red": "blue",
+                                                      "blue": "red"})])
+    return scores.reindex(opponents).to_numpy(dtype="float64")
+
+
+def solve(incidence, rhs):
+    """Solves the least squares problem *incidence @ x = rhs*.
+
+    The normal equations are factored once with a Cholesky
+    decomposition and every column of *rhs* is solved with the same
+    factor. Early in an event, when some teams have always played
+    together, the normal matrix is singular and the minimum norm
+    solution is returned instead.
+
+    Args:
+        incidence: (numpy.ndarray) An alliance-team incidence matrix.
+        rhs: (numpy.ndarray) One row per alliance and one column per
+            statistic.
+
+    Returns:
+        A numpy.ndarray with one row per team and one column per
+        statistic.
+    """
+    normal = incidence.T @ incidence
+    try:
+        lower = numpy.linalg.cholesky(normal)
+    except numpy.linalg.LinAlgError:
+        lower = None
+    # Roundoff can let a singular matrix through with a tiny pivot.
+    if lower is not None and lower.size:
+        diag = numpy.diag(lower)
+        if diag.min() > 1e-6 * diag.max():
+            return numpy.linalg.solve(
+                lower.T, numpy.linalg.solve(lower, incidence.T @ rhs))
+    return numpy.linalg.lstsq(incidence, rhs, rcond=None)[0]
+
+
+def compute_oprs(matches):
+    """Computes OPR, DPR, and CCWM from qualification match results.
+
+    Args:
+        matches: (pandas.DataFrame) A dataframe returned by
+            ``tbap.api.get_matches()`` for a single event.
+
+    Returns:
+        A pandas.DataFrame indexed by team, with columns *oprs*, *dprs*,
+        and *ccwms*, in the same format as ``tbap.api.get_oprs()``.
+    """
+    incidence, teams, alliances = build_incidence(matches)
+    rhs = numpy.column_stack([alliances["score"].to_numpy(dtype="float64"),
+                              opponent_scores(alliances)])
+    played = ~numpy.isnan(rhs).any(axis=1)
+    result = solve(incidence[played], rhs[played])
+    return pandas.DataFrame({"oprs": result[:, 0],
+                             "dprs": result[:, 1],
+                             "ccwms": result[:, 0] - result[:, 1]},
+                            index=teams)
+
+
+# Numeric match columns that are not scores.
+NON_SCORE_COLUMNS = ["match_number", "set_number", "surrogate",
+                     "disqualified"]
+
+# Types, as reported by pandas.api.types.infer_dtype(), of columns that
+#   can be converted to float.
+NUMERIC_TYPES = ["boolean", "integer", "floating", "mixed-integer-float",
+                 "decimal"]
+
+
+def score_columns(alliances):
+    """Returns the names of the numeric and boolean score columns.
+
+    A column is selected by the types of its values rather than by its
+    dtype, because matches without a score breakdown leave NaN in the
+    breakdown columns, which turns boolean columns into object columns.
+    """
+    return [col for col in alliances.columns
+            if col not in NON_SCORE_COLUMNS and
+            not str(col).endswith("time") and
+            pandas.api.types.infer_dtype(alliances[col]) in NUMERIC_TYPES]
+
+
+def compute_component_oprs(matches, columns=None):
+    """Computes an OPR for each score breakdown column.
+
+    Columns are solved together: the incidence matrix is factored once
+    and the alliance values of the columns form the columns of a
+    single right-hand side matrix. Columns with values missing from
+    some alliances, such as when a match has no score breakdown, are
+    grouped by the alliances that are missing, and each group is
+    solved with one factorization of the rows that have values.
+
+    Args:
+        matches: (pandas.DataFrame) A dataframe returned by
+            ``tbap.api.get_matches()`` for a single event.
+        columns: (list) The names of the columns to compute. Optional.
+            Default is the *score* column and all numeric and boolean
+            score breakdown columns. Boolean columns are treated as 0
+            or 1.
+
+    Returns:
+        A pandas.DataFrame indexed by team, with one column for each
+        item in *columns*.
+    """
+    incidence, teams, alliances = build_incidence(matches)
+    if columns is None:
+        columns = score_columns(alliances)
+    values = alliances[columns].to_numpy(dtype="float64")
+    result = numpy.empty((len(teams), len(columns)))
+    missing = numpy.isnan(values)
+    groups = collections.OrderedDict()
+    for idx in range(len(columns)):
+        groups.setdefault(missing[:, idx].tobytes(), []).append(idx)
+    for idxs in groups.values():
+        present = ~missing[:, idxs[0]]
+        result[:, idxs] = solve(incidence[present],
+                                values[numpy.ix_(present, idxs)])
+    return pandas.DataFrame(result, index=teams, columns=columns)
+
+
+class OprTracker(object):
+    """Updates OPR, DPR, and CCWM as match results arrive.
+
+    The tracker keeps the normal equations *A.T @ A* and *A.T @ s* and
+    the inverse of *A.T @ A*. Each new or corrected alliance result
+    changes *A.T @ A* by a rank-one matrix, so the inverse is updated
+    with the Sherman-Morrison formula in O(n^2) time for n teams,
+    instead of being recomputed in O(n^3) time. The inverse is
+    recomputed when new teams appear, while the normal matrix is still
+    singular, and after every *refactor_every* updates to limit the
+    accumulation of rounding errors. The results match those of
+    compute_oprs() for the same matches.
+
+    Attributes:
+        teams: (list) The team keys, in the order they first appeared.
+        updates: (int) The number of rank-one updates applied.
+        refactors: (int) The number of times the inverse was computed
+            from the normal matrix.
+        refactor_every: (int) The maximum number of rank-one updates
+            applied to an inverse before it is recomputed.
+    """
+
+    def __init__(self, refactor_every=200):
+        self.teams = []
+        self.updates = 0
+        self.refactors = 0
+        self.refactor_every = refactor_every
+        self._team_idx = {}
+        # (match key, alliance) -> (team indexes, [score, opponent score])
+        self._alliances = {}
+        self._normal = numpy.zeros((0, 0))
+        self._rhs = numpy.zeros((0, 2))
+        self._inverse = None
+        self._since_refactor = 0
+
+    def update(self, matches):
+        """Adds new and corrected results from a match dataframe.
+
+        Args:
+            matches: (pandas.DataFrame) A dataframe returned by
+                ``tbap.api.get_matches()`` or
+                ``tbap.api.MatchTracker.frame``. It may contain all
+                matches of the event or only new matches.
+
+        Returns:
+            The number of alliance results that were added or changed.
+        """
+        rows = qualification_rows(matches)
+        teams = collections.OrderedDict()
+        scores = {}
+        for key, alliance, team, score in zip(
+                rows["key"], rows["alliance"], rows["team_key"],
+                rows["score"]):
+            teams.setdefault((key, alliance), []).append(team)
+            scores[(key, alliance)] = float(score)
+
+        num_teams = len(self.teams)
+        for team_list in teams.values():
+            for team in team_list:
+                if team not in self._team_idx:
+                    self._team_idx[team] = len(self.teams)
+                    self.teams.append(team)
+        if len(self.teams) > num_teams:
+            self._grow(len(self.teams))
+
+        changed = 0
+        for (key, alliance), team_list in teams.items():
+            opponent = scores.get((key, "red" if alliance == "blue"
+                                   else "blue"))
+            if opponent is None:
+                continue
+            result = (tuple(self._team_idx[team] for team in team_list),
+                      (scores[(key, alliance)], opponent))
+            old = self._alliances.get((key, alliance))
+            if old == result:
+                continue
+            if old is not None:
+                self._add(old, -1)
+            self._add(result, 1)
+            self._alliances[(key, alliance)] = result
+            changed += 1
+        return changed
+
+    def _grow(self, size):
+        """Adds rows and columns for new teams to the normal matrix."""
+        old = self._normal.shape[0]
+        normal = numpy.zeros((size, size))
+        normal[:old, :old] = self._normal
+        rhs = numpy.zeros((size, 2))
+        rhs[:old] = self._rhs
+        self._normal = normal
+        self._rhs = rhs
+        self._inverse = None
+
+    def _add(self, result, sign):
+        """Adds (sign=1) or removes (sign=-1) one alliance result."""
+        idxs, values = result
+        idxs = list(idxs)
+        self._normal[numpy.ix_(idxs, idxs)] += sign
+        self._rhs[idxs] += sign * numpy.array(values)
+        if self._inverse is None:
+            return
+        # Sherman-Morrison: the alliance row a has ones at idxs, so
+        #   inverse @ a is a sum of columns.
+        inv_a = self._inverse[:, idxs].sum(axis=1)
+        denom = 1 + sign * inv_a[idxs].sum()
+        if abs(denom) < 1e-9 or self._since_refactor >= self.refactor_every:
+            self._inverse = None
+            return
+        self._inverse -= (sign / denom) * numpy.outer(inv_a, inv_a)
+        self._since_refactor += 1
+        self.updates += 1
+
+    def _refactor(self):
+        """Computes the inverse of the normal matrix if it is regular."""
+        self._since_refactor = 0
+        if not self.teams:
+            return
+        try:
+            lower = numpy.linalg.cholesky(self._normal)
+        except numpy.linalg.LinAlgError:
+            return
+        diag = numpy.diag(lower)
+        if diag.min() > 1e-6 * diag.max():
+            inv_lower = numpy.linalg.inv(lower)
+            self._inverse = inv_lower.T @ inv_lower
+            self.refactors += 1
+
+    @property
+    def oprs(self):
+        """A dataframe in the same format as compute_oprs()."""
+        if self._inverse is None:
+            self._refactor()
+        if self._inverse is not None:
+            result = self._inverse @ self._rhs
+        else:
+            # Minimum norm solution, as in solve()
+            result = numpy.linalg.lstsq(self._normal, self._rhs,
+                                        rcond=None)[0]
+        frame = pandas.DataFrame({"oprs": result[:, 0],
+                                  "dprs": result[:, 1],
+                                  "ccwms": result[:, 0] - result[:, 1]},
+                                 index=pandas.Index(self.teams, name="team"))
+        return frame.sort_index()
@@ -9,15 +9,26 @@ Version:
 
 Copyright 2017, Stacy Irwin
 """
+import base64
+import collections
 import datetime
+import email.utils
+import http.client
+import importlib
 import json
 import os
 import os.path
 import pickle
+import random
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
 import urllib.request
 import urllib.error
-import base64
 import warnings
+import zlib
 
 import pandas
 from pandas.io import json as pj
@@ -28,6 +39,66 @@ from pandas.io import json as pj
 #todo(stacy.irwin): Take advantage Json_normalize -- will expand dict fields if record_path = None
 
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content encodings requested from the server. Brotli is only requested
+#   if the brotli package is installed.
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+
+# Fast JSON libraries that are used instead of the standard json module
+#   if they are installed, in order of preference.
+JSON_BACKENDS = ["orjson", "simdjson", "ujson", "json"]
+
+
+def set_json_backend(name=None):
+    """Selects the library used to parse JSON responses.
+
+    Args:
+        name: (str)
+            One of "orjson", "simdjson", "ujson", or "json". Optional.
+            If omitted, the first installed library in JSON_BACKENDS
+            is used.
+
+    Returns:
+        The name of the selected library.
+
+    Raises:
+        ImportError if the requested library is not installed.
+        ValueError if *name* is not a supported library.
+    """
+    global _json_loads, _json_backend  # pylint: disable=global-statement
+    if name is not None and name not in JSON_BACKENDS:
+        raise ValueError("name must be one of " + ", ".join(JSON_BACKENDS))
+    for backend in JSON_BACKENDS if name is None else [name]:
+        try:
+            module = importlib.import_module(backend)
+        except ImportError:
+            if name is not None:
+                raise
+            continue
+        _json_loads = module.loads
+        _json_backend = backend
+        return backend
+
+
+def get_json_backend():
+    """Returns the name of the library used to parse JSON responses."""
+    return _json_backend
+
+
+def json_loads(text):
+    """Parses JSON text or bytes with the selected JSON library."""
+    return _json_loads(text)
+
+
+_json_loads = json.loads
+_json_backend = "json"
+set_json_backend()
+
+
 def build_tba_url(session, http_args):
     url = session.TBA_URL
     for arg in http_args:
@@ -118,47 +189,804 @@ def httpdate_addsec(http_date, gmt=True):
     return datetime_to_httpdate(dtm_new, gmt)
 
 
-def send_http_request(session, args, mod_since=None):
-    url = session.TBA_URL
-    for arg in args:
-        url += "/" + str(arg)
+def send_http_request(session, args, mod_since=None, force_refresh=False):
+    """Sends an HTTP request to the TBA Read API server.
+
+    If the session coalesces requests, a call made while an identical
+    request (same URL and *mod_since*) is already in flight on another
+    thread waits for that request and returns a copy of its response,
+    with the *shared* key set to True. The copy shares the parsed JSON
+    with the original response.
+
+    If the session has a memory cache and neither *mod_since* nor
+    *force_refresh* is specified, a response that is still fresh
+    according to its *Cache-Control* header is returned without
+    contacting the server.
+
+    If the session has a response cache and *mod_since* is not
+    specified, the request is sent with the validators of the cached
+    response. A 304 reply is then answered from the cache, so the
+    caller receives the same data as a 200 reply, with the
+    *from_cache* key set to True.
+
+    Args:
+        session: (tbap.api.Session)
+        args: (list) The URL path segments.
+        mod_since: (str) An HTTP formatted date and time. Optional.
+        force_refresh: (bool) If True, skips the memory cache. Optional.
+
+    Returns:
+        A tbap.server.Response object, which is a Python dictionary
+        with the HTTP status code, the response headers, and the JSON
+        text of the response.
+    """
+    url = build_tba_url(session, args)
+    if session.flights is None:
+        return fetch_response(session, url, args, mod_since, force_refresh)
+
+    # A forced refresh must not be answered by a normal request, which
+    #   may be served from the memory cache.
+    data, shared = session.flights.do(
+        (url, mod_since, force_refresh),
+        lambda: fetch_response(session, url, args, mod_since, force_refresh))
+    if shared:
+        data = data.copy()
+        data["args"] = args
+        data["shared"] = True
+    return data
+
+
+def fetch_response(session, url, args, mod_since=None, force_refresh=False):
+    """Sends a request without coalescing. See send_http_request()."""
+    use_memory = session.memory_cache is not None and mod_since is None
+    if use_memory and not force_refresh:
+        data = session.memory_cache.get(url)
+        if data is not None:
+            data["args"] = args
+            return data
 
     hdrs = {"X-TBA-Auth-Key": session.key,
             "X-TBA-App-Id": session.username + ":Tbap-Python-Package:0.9",
-            "User-Agent": session.username + ":Tbap-Python-Package:0.9"}
+            "User-Agent": session.username + ":Tbap-Python-Package:0.9",
+            "Accept-Encoding": ACCEPT_ENCODING}
     if mod_since is not None and httpdate_to_datetime(mod_since, True):
         hdrs["If-Modified-Since"] = mod_since
 
-    data = {}
-    req = urllib.request.Request(url, headers=hdrs)
+    cached = None
+    if session.cache is not None and mod_since is None:
+        cached = session.cache.get(url)
+    req_hdrs = dict(hdrs)
+    if cached is not None:
+        if cached["Last-Modified"] is not None:
+            req_hdrs["If-Modified-Since"] = cached["Last-Modified"]
+        if cached["ETag"] is not None:
+            req_hdrs["If-None-Match"] = cached["ETag"]
+
+    data = Response()
+    retries = 0
     try:
-        with urllib.request.urlopen(req) as resp:
-            data["code"] = resp.getcode()
-            # Using json.dumps(json.loads()) to remove carriage returns from
-            #   json text provided by Blue Allianc.
-            data["text"] = json.dumps(json.loads(resp.read().decode("utf-8")))
-            data["url"] = resp.geturl()
-            for key, value in resp.info().items():
-                data[key] = value
-    except urllib.error.HTTPError as err:
-        data["code"] = err.code
-        data["url"] = err.url
-        for key, value in err.headers.items():
+        result, retries = send_with_retries(session, url, req_hdrs)
+        code, reason, headers, body, wire_bytes = result
+        data["code"] = code
+        data["url"] = url
+        for key, value in headers:
             data[key] = value
-        if err.code != 304:
-            data["error_message"] = "HTTPError, Code {}: {}".format(err.code,
-                                                                    err.reason)
+        data["compressed_bytes"] = wire_bytes
+        data["decompressed_bytes"] = len(body)
+        if code == 304 and cached is not None:
+            data["code"] = 200
+            data["from_cache"] = True
+            for key in ["Last-Modified", "ETag", "Cache-Control"]:
+                if key not in data and cached[key] is not None:
+                    data[key] = cached[key]
+            body = cached["body"]
+            if no_store(data):
+                session.cache.delete(url)
+            else:
+                session.cache.refresh(url, data)
+        elif code == 200 and session.cache is not None:
+            if no_store(data):
+                session.cache.delete(url)
+            else:
+                session.cache.put(url, body, data)
+        if data["code"] == 200:
+            data.body = body
+            data["text"] = body.decode("utf-8")
+            if use_memory:
+                data["args"] = args
+                session.memory_cache.put(url, data)
+        elif code != 304:
+            data["error_message"] = "HTTPError, Code {}: {}".format(code,
+                                                                    reason)
             warnings.warn(data["error_message"])
-    except urllib.error.URLError as err:
-        data["error_message"] = "URLError: {}".format(err.reason)
+    except (OSError, http.client.HTTPException) as err:
+        # send_with_retries() only raises after the last retry.
+        retries = session.max_retries
+        data["error_message"] = "ConnectionError: {}".format(err)
         warnings.warn(data["error_message"])
     finally:
         data["args"] = args
+        data["retries"] = retries
         if "If-Modified-Since" in hdrs:
             data["If-Modified-Since"] = hdrs["If-Modified-Since"]
+        session.request_stats.record(args, retries, "error_message" in data)
     return data
 
 
+# HTTP codes indicating that the request may succeed if sent again later.
+RETRY_CODES = [429, 500, 502, 503, 504]
+
+
+def send_with_retries(session, url, headers):
+    """Sends a request, retrying throttled and failed attempts.
+
+    Each attempt waits for a token from the session's rate limiter, if
+    any. Attempts that fail with a connection error or one of the
+    RETRY_CODES are retried up to *session.max_retries* times. The
+    delay before each retry is the server's *Retry-After* value if
+    provided, and otherwise grows exponentially from *session.backoff*
+    seconds with random jitter. Delays never exceed
+    *session.max_backoff* seconds.
+
+    Args:
+        session: (tbap.api.Session)
+        url: (str) The full URL of the request.
+        headers: (dict) The HTTP request headers.
+
+    Returns:
+        A tuple containing the tuple returned by
+        ConnectionPool.request() and the number of retries.
+
+    Raises:
+        OSError or http.client.HTTPException if the last attempt
+        failed with a connection error.
+    """
+    retries = 0
+    while True:
+        if session.rate_limiter is not None:
+            session.rate_limiter.acquire()
+        try:
+            with session.request_slots:
+                result = session.pool.request(url, headers)
+        except (OSError, http.client.HTTPException):
+            if retries >= session.max_retries:
+                raise
+            delay = None
+        else:
+            if result[0] not in RETRY_CODES or retries >= session.max_retries:
+                return result, retries
+            delay = retry_after(dict(result[2]).get("Retry-After"))
+        if delay is None:
+            delay = random.uniform(0, session.backoff * 2 ** retries)
+        time.sleep(min(delay, session.max_backoff))
+        retries += 1
+
+
+def retry_after(value):
+    """Converts a Retry-After header to a number of seconds.
+
+    Args:
+        value: (str) Either a number of seconds or an HTTP date.
+
+    Returns:
+        The number of seconds to wait, or None if *value* is None or
+        invalid.
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((when - now).total_seconds(), 0)
+
+
+def endpoint_name(args):
+    """Returns a URL template that identifies a TBA endpoint.
+
+    Path segments that contain digits, such as team, event, and match
+    keys, years, and page numbers, are replaced with "*". For example,
+    ["event", "2017pncmp", "rankings"] becomes "event/*/rankings".
+    """
+    return "/".join("*" if re.search(r"\d", str(arg)) else str(arg)
+                    for arg in args)
+
+
+class SingleFlight(object):
+    """Runs at most one call at a time for each key.
+
+    Threads that call do() with a key that is already being processed
+    by another thread wait for that call to finish and receive its
+    result instead of repeating the call.
+
+    Attributes:
+        shared: (int) The number of calls that received another call's
+            result.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Calls *func* unless a call with the same *key* is in flight.
+
+        Returns:
+            A tuple containing the result of *func* and a bool that is
+            True if the result came from another thread's call. If the
+            call raises an exception, all waiting threads raise it too.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = {"done": threading.Event()}
+            else:
+                self.shared += 1
+        if not leader:
+            flight["done"].wait()
+            if "error" in flight:
+                raise flight["error"]
+            return flight["result"], True
+        try:
+            flight["result"] = func()
+        except BaseException as err:
+            flight["error"] = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight["done"].set()
+        return flight["result"], False
+
+
+class RequestStats(object):
+    """Counts requests, retries, and failures for each TBA endpoint.
+
+    The counts are thread safe. Endpoints are identified by
+    endpoint_name().
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, args, retries, failed):
+        """Records one call to send_http_request()."""
+        endpoint = endpoint_name(args)
+        with self._lock:
+            counts = self._counts.setdefault(
+                endpoint, {"requests": 0, "retries": 0, "failures": 0})
+            counts["requests"] += 1
+            counts["retries"] += retries
+            counts["failures"] += int(failed)
+
+    def to_dict(self):
+        """Returns a copy of the counts, keyed by endpoint."""
+        with self._lock:
+            return {key: dict(val) for key, val in self._counts.items()}
+
+
+# Held while a Response parses its JSON. Parsing holds the GIL, so a
+#   single lock for all responses does not reduce concurrency.
+PARSE_LOCK = threading.Lock()
+
+
+class Response(dict):
+    """The data returned by send_http_request().
+
+    A Response is a Python dictionary containing the HTTP status code,
+    the response headers, and the JSON text under the *text* key. The
+    raw response body is available from the *body* attribute. The
+    parsed JSON is available from the *jdata* attribute, which parses
+    the body on first access and returns the same object afterwards.
+    Callers must not modify *jdata*, because it is shared by copies of
+    the response.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.body = None
+        # Shared by copies so that the JSON is parsed at most once. The
+        #   lock is not stored in the response so that it can be pickled.
+        self._parsed = {}
+
+    @property
+    def jdata(self):
+        parsed = self._parsed
+        if "jdata" not in parsed:
+            with PARSE_LOCK:
+                if "jdata" not in parsed:
+                    parsed["jdata"] = json_loads(
+                        self.body if self.body is not None else self["text"])
+        return parsed["jdata"]
+
+    def copy(self):
+        """Returns a shallow copy that shares the parsed JSON."""
+        other = Response(self)
+        other.body = self.body
+        other._parsed = self._parsed  # pylint: disable=protected-access
+        return other
+
+
+def no_store(headers):
+    """Returns True if the response must not be written to a cache.
+
+    Args:
+        headers: (dict) The HTTP response headers.
+    """
+    return "no-store" in (headers.get("Cache-Control") or "").lower()
+
+
+def cache_max_age(headers):
+    """Returns the number of seconds a response remains fresh.
+
+    Args:
+        headers: (dict) The HTTP response headers.
+
+    Returns:
+        The *max-age* value of the *Cache-Control* header, less the
+        value of the *Age* header, or 0 if the response must not be
+        reused.
+    """
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if no_store(headers) or "no-cache" in cache_control:
+        return 0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match is None:
+        return 0
+    try:
+        age = int(headers.get("Age", 0))
+    except ValueError:
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+class MemoryCache(object):
+    """Keeps fresh responses in memory.
+
+    Responses are kept for as long as their *Cache-Control: max-age*
+    header allows. The cache keeps the headers and the JSON text of
+    each response, but not the raw body or the parsed JSON: every
+    response returned by get() parses its text on first access to
+    *jdata*. The size of a response is the length of its text in
+    UTF-8 bytes, which is the size of the response body. When the
+    total size exceeds *max_bytes*, the least recently used responses
+    are discarded. The cache is thread safe.
+
+    Attributes:
+        max_bytes: (int)
+            The maximum total size of the cached JSON text, in bytes.
+        size: (int)
+            The current total size of the cached JSON text, in bytes.
+        hits: (int)
+            The number of lookups answered from the cache.
+        misses: (int)
+            The number of lookups that were not in the cache or had
+            expired.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Returns a copy of the cached response for *url*, or None."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._discard(url)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+            # Not copy(), which would share the parsed JSON.
+            data = Response(entry[2])
+        data["from_cache"] = True
+        return data
+
+    def put(self, url, data):
+        """Stores a response if its headers allow it to be reused."""
+        max_age = cache_max_age(data)
+        if max_age <= 0:
+            return
+        body = getattr(data, "body", None)
+        nbytes = (len(body) if body is not None
+                  else len(data.get("text", "").encode("utf-8")))
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if url in self._entries:
+                self._discard(url)
+            self._entries[url] = (time.monotonic() + max_age, nbytes,
+                                  Response(data))
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        """Discards all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _discard(self, url):
+        self.size -= self._entries.pop(url)[1]
+
+
+class ResponseCache(object):
+    """Stores TBA responses in an SQLite database on disk.
+
+    Each response body is stored with its *Last-Modified*, *ETag*, and
+    *Cache-Control* headers, keyed by the request URL. The cache
+    persists between Python sessions and is thread safe.
+
+    Attributes:
+        path: (str)
+            The location of the SQLite database file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, body BLOB, last_modified TEXT, "
+                "etag TEXT, cache_control TEXT, stored REAL)")
+
+    def get(self, url):
+        """Returns the cached response for *url*, or None.
+
+        The response is a Python dictionary with keys *body*,
+        *Last-Modified*, *ETag*, *Cache-Control*, and *stored* (the
+        time the response was stored, in seconds since the epoch).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, last_modified, etag, cache_control, stored "
+                "FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(["body", "Last-Modified", "ETag", "Cache-Control",
+                         "stored"], row))
+
+    def put(self, url, body, headers):
+        """Stores a response body and its validator headers."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, body, headers.get("Last-Modified"), headers.get("ETag"),
+                 headers.get("Cache-Control"), time.time()))
+
+    def refresh(self, url, headers):
+        """Updates the validator headers and stored time of a response.
+
+        Used when the server answers a conditional request with *304
+        Not Modified*. Headers missing from *headers* keep their
+        cached values.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET "
+                "last_modified = COALESCE(?, last_modified), "
+                "etag = COALESCE(?, etag), "
+                "cache_control = COALESCE(?, cache_control), stored = ? "
+                "WHERE url = ?",
+                (headers.get("Last-Modified"), headers.get("ETag"),
+                 headers.get("Cache-Control"), time.time(), url))
+
+    def delete(self, url):
+        """Deletes the cached response for *url*, if there is one."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def clear(self):
+        """Deletes all cached responses."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TokenBucket(object):
+    """Limits the average rate of calls while allowing short bursts.
+
+    The bucket holds up to *burst* tokens and gains *rate* tokens per
+    second. Each call to acquire() takes one token, sleeping until one
+    is available. The bucket is thread safe; callers are served in the
+    order they arrive.
+
+    Attributes:
+        rate: (float) Tokens added per second.
+        burst: (int) The maximum number of tokens in the bucket.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then takes it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens +
+                               (now - self._updated) * self.rate)
+            self._updated = now
+            # The token balance may go negative. The deficit is the
+            #   time this caller has to wait, and later callers queue
+            #   behind it.
+            self._tokens -= 1
+            delay = -self._tokens / self.rate
+        if delay > 0:
+            time.sleep(delay)
+
+
+# HTTP status codes of redirects that ConnectionPool follows.
+REDIRECT_CODES = [301, 302, 303, 307, 308]
+# Request headers, in lower case, that are not sent to other servers
+#   when following a redirect.
+PRIVATE_HEADERS = ["x-tba-auth-key", "x-tba-app-id"]
+
+
+class ConnectionPool(object):
+    """Keeps HTTP connections to the TBA Read API server open for reuse.
+
+    Opening a new HTTPS connection requires a TCP and TLS handshake,
+    which usually takes longer than the request itself. The pool
+    keeps up to *pool_size* idle keep-alive connections and hands them
+    out to subsequent requests. The pool is thread safe.
+
+    As with ``urllib.request.urlopen()``, the proxy configured in the
+    *http_proxy* or *https_proxy* environment variable is used unless
+    the host is listed in *no_proxy*. HTTPS requests are tunneled
+    through the proxy with CONNECT. Redirects are followed.
+
+    Attributes:
+        url: (str)
+            The URL the pool was created for.
+        host: (str)
+            The host name of the server.
+        proxy: (urllib.parse.SplitResult)
+            The proxy URL, or None if requests go directly to the
+            server.
+        pool_size: (int)
+            The maximum number of idle connections kept open.
+        idle_timeout: (int or float)
+            Idle connections older than this number of seconds are
+            closed instead of reused.
+        handshakes: (int)
+            The number of new connections opened by the pool.
+    """
+
+    # Redirects followed per request before giving up, as in urllib.
+    MAX_REDIRECTS = 10
+
+    def __init__(self, url, pool_size=4, idle_timeout=60):
+        self.url = url
+        parts = urllib.parse.urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.handshakes = 0
+        self.proxy = None
+        proxy_url = urllib.request.getproxies().get(self.scheme)
+        if proxy_url and not urllib.request.proxy_bypass(parts.netloc):
+            if "://" not in proxy_url:
+                proxy_url = "http://" + proxy_url
+            self.proxy = urllib.parse.urlsplit(proxy_url)
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+
+    def _proxy_headers(self):
+        if self.proxy.username is None:
+            return {}
+        credentials = "{}:{}".format(
+            urllib.parse.unquote(self.proxy.username),
+            urllib.parse.unquote(self.proxy.password or ""))
+        return {"Proxy-Authorization": "Basic " + base64.b64encode(
+            credentials.encode("utf-8")).decode("ascii")}
+
+    def _connect(self):
+        with self._lock:
+            self.handshakes += 1
+        if self.proxy is None:
+            if self.scheme == "http":
+                return http.client.HTTPConnection(self.host, self.port)
+            return http.client.HTTPSConnection(self.host, self.port)
+        if self.scheme == "http":
+            # Plain HTTP requests are sent to the proxy with the full URL.
+            return http.client.HTTPConnection(self.proxy.hostname,
+                                              self.proxy.port or 80)
+        conn = http.client.HTTPSConnection(self.proxy.hostname,
+                                           self.proxy.port or 80)
+        conn.set_tunnel(self.host, self.port, headers=self._proxy_headers())
+        return conn
+
+    def acquire(self):
+        """Returns an idle connection, or a new one if none are idle.
+
+        Returns:
+            A tuple containing an ``http.client.HTTPConnection`` and a
+            boolean that is True if the connection was reused.
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, last_used = self._idle.pop()
+                if now - last_used < self.idle_timeout:
+                    return conn, True
+                conn.close()
+        return self._connect(), False
+
+    def release(self, conn):
+        """Returns a connection to the pool, or closes it if full."""
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        """Closes all idle connections."""
+        with self._lock:
+            while self._idle:
+                self._idle.pop()[0].close()
+
+    def request(self, url, headers):
+        """Sends an HTTP GET request over a pooled connection.
+
+        If a reused connection turns out to have been closed by the
+        server, the request is retried once on a new connection.
+        Redirects to the same server use the pool. Redirects to
+        another server use a temporary pool, whose new connections
+        are added to *handshakes*, and do not send the TBA
+        authorization headers (see PRIVATE_HEADERS).
+
+        Args:
+            url: (str)
+                The full URL of the request.
+            headers: (dict)
+                The HTTP request headers.
+
+        Returns:
+            A tuple containing the HTTP status code, the reason
+            phrase, a list of (header, value) tuples, the decompressed
+            response body as bytes, and the number of body bytes
+            received over the network.
+        """
+        pool = self
+        others = []
+        try:
+            for _ in range(self.MAX_REDIRECTS + 1):
+                # pylint: disable=protected-access
+                result = pool._send(url, headers)
+                location = next((value for key, value in result[2]
+                                 if key.lower() == "location"), None)
+                if result[0] not in REDIRECT_CODES or not location:
+                    return result
+                url = urllib.parse.urljoin(url, location)
+                target = ConnectionPool.server_of(url)
+                if target == ConnectionPool.server_of(pool.url):
+                    continue
+                headers = {key: value for key, value in headers.items()
+                           if key.lower() not in PRIVATE_HEADERS}
+                if target == ConnectionPool.server_of(self.url):
+                    pool = self
+                else:
+                    pool = ConnectionPool(url, pool_size=0)
+                    others.append(pool)
+            raise http.client.HTTPException(
+                "Too many redirects: {}".format(url))
+        finally:
+            for other in others:
+                other.close()
+                with self._lock:
+                    self.handshakes += other.handshakes
+
+    @staticmethod
+    def server_of(url):
+        """Returns the scheme, host name, and port of *url*."""
+        parts = urllib.parse.urlsplit(url)
+        return parts.scheme, parts.hostname, parts.port
+
+    def _send(self, url, headers):
+        if self.proxy is not None and self.scheme == "http":
+            path = url
+            headers = dict(headers, **self._proxy_headers())
+        else:
+            parts = urllib.parse.urlsplit(url)
+            path = parts.path + ("?" + parts.query if parts.query else "")
+        while True:
+            conn, reused = self.acquire()
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body, wire_bytes = read_body(resp)
+            except (ConnectionError, http.client.BadStatusLine):
+                conn.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self.release(conn)
+            return (resp.status, resp.reason, resp.getheaders(), body,
+                    wire_bytes)
+
+
+def read_body(resp, chunk_size=65536):
+    """Reads and decompresses an HTTP response body.
+
+    Compressed bodies are decompressed one chunk at a time as they are
+    read from the connection, so the compressed body is never held in
+    memory in full.
+
+    Args:
+        resp: (http.client.HTTPResponse)
+        chunk_size: (int) The number of bytes read at a time. Optional.
+
+    Returns:
+        A tuple containing the decompressed body as bytes and the
+        number of bytes read from the connection.
+
+    Raises:
+        http.client.HTTPException if the *Content-Encoding* is not
+        supported.
+    """
+    encoding = resp.getheader("Content-Encoding", "identity").strip().lower()
+    if encoding in ["", "identity"]:
+        body = resp.read()
+        return body, len(body)
+    if encoding in ["gzip", "x-gzip"]:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        decompressor = zlib.decompressobj()
+    elif encoding == "br" and brotli is not None:
+        decompressor = brotli.Decompressor()
+    else:
+        raise http.client.HTTPException(
+            "Unsupported Content-Encoding: " + encoding)
+    # brotli.Decompressor has process() instead of decompress().
+    decompress = getattr(decompressor, "decompress", None)
+    if decompress is None:
+        decompress = decompressor.process
+    chunks = []
+    wire_bytes = 0
+    chunk = resp.read(chunk_size)
+    while chunk:
+        wire_bytes += len(chunk)
+        chunks.append(decompress(chunk))
+        chunk = resp.read(chunk_size)
+    if hasattr(decompressor, "flush"):
+        chunks.append(decompressor.flush())
+    return b"".join(chunks), wire_bytes
+
+
 def send_http_request_old(session, url, cmd, mod_since=None, only_mod_since=None):
     """Sends http request to FIRST API server and returns response.
 
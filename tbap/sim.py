@@ -0,0 +1,164 @@
+"""Simulates the remaining qualification matches of an event.
+
+The Blue Alliance predicts the score and ranking point probabilities
+of each alliance in each qualification match. ``simulate_rankings()``
+samples the outcomes of the matches that have not been played from
+those predictions, adds the ranking points already earned, and counts
+how often each team finishes at each rank::
+
+    matches = api.get_matches(session, event="2017pncmp")
+    predictions = api.get_predictions(session, "2017pncmp")["predictions"]
+    ranks = sim.simulate_rankings(matches, predictions)
+    ranks.loc["frc1318", 1]  # Probability that 1318 is ranked first
+
+All simulated events in a batch are sampled and ranked together with
+NumPy array operations, so 100,000 simulations of a typical event take
+a few seconds or less.
+
+The ranking point rules are those of the 2017 game: two points for a
+win, one for a tie, and one each for the pressure (kPa) and rotor
+bonuses. Teams are ranked by ranking points and then by total match
+points.
+"""
+import numpy
+import pandas
+
+import tbap.server as server
+
+# Ranking point bonus columns of the match dataframe, and the
+#   prediction statistics that give their probability.
+BONUS_COLUMNS = {"kPaRankingPointAchieved": "prob_pressure",
+                 "rotorRankingPointAchieved": "prob_gears"}
+WIN_POINTS = 2
+TIE_POINTS = 1
+
+
+def team_rows(matches):
+    """Returns one row per team per qualification match alliance.
+
+    Surrogate appearances are removed, because ranking points earned
+    as a surrogate do not count.
+    """
+    if "team_key" not in matches.columns:
+        matches = matches.reset_index()
+    qual = matches[matches["comp_level"] == "qm"]
+    surrogate = qual["surrogate"].astype(bool)
+    pairs = pandas.MultiIndex.from_arrays([qual["key"], qual["team_key"]])
+    surrogate_pairs = pairs[surrogate.to_numpy()]
+    return qual[~surrogate.to_numpy() & ~pairs.isin(surrogate_pairs)]
+
+
+def earned_points(rows):
+    """Returns the ranking points and match points earned so far.
+
+    Args:
+        rows: (pandas.DataFrame) Rows returned by team_rows().
+
+    Returns:
+        A tuple containing two pandas.Series indexed by team key.
+    """
+    played = rows[rows["score"] >= 0]
+    ranking = ((played["winning_alliance"] == played["alliance"]) *
+               WIN_POINTS +
+               (played["winning_alliance"] == "") * TIE_POINTS)
+    for col in BONUS_COLUMNS:
+        if col in played.columns:
+            ranking = ranking + played[col].fillna(False).astype(int)
+    teams = rows["team_key"].unique()
+    ranking = ranking.groupby(played["team_key"]).sum()
+    points = played["score"].groupby(played["team_key"]).sum()
+    return (ranking.reindex(teams, fill_value=0),
+            points.reindex(teams, fill_value=0))
+
+
+def simulate_rankings(matches, predictions,  # pylint: disable=too-many-arguments
+                      num_sims=100000, batch_size=10000, ranking_points=None,
+                      seed=None):
+    """Estimates the probability of each team finishing at each rank.
+
+    Args:
+        matches: (pandas.DataFrame) A dataframe returned by
+            ``tbap.api.get_matches()`` for a single event. Matches with
+            a score of -1 have not been played and are simulated.
+        predictions: (pandas.DataFrame) The *predictions* dataframe
+            returned by ``tbap.api.get_predictions()``.
+        num_sims: (int) The number of simulated events. Optional.
+            Default is 100,000.
+        batch_size: (int) The number of events simulated at once.
+            Larger batches are faster but use more memory. Optional.
+            Default is 10,000.
+        ranking_points: (pandas.Series) The ranking points earned so
+            far, indexed by team key. Optional. By default they are
+            computed from the played matches.
+        seed: (int) Seeds the random number generator. Optional.
+
+    Returns:
+        A pandas.DataFrame indexed by team, with one column for each
+        rank from 1 to the number of teams, containing the probability
+        of the team finishing at that rank. Teams are sorted by their
+        average simulated rank.
+
+    Raises:
+        tbap.server.ArgumentError: If an unplayed match has no
+            prediction.
+    """
+    rows = team_rows(matches)
+    earned_rp, earned_pts = earned_points(rows)
+    if ranking_points is not None:
+        earned_rp = ranking_points.reindex(earned_rp.index, fill_value=0)
+    teams = earned_rp.index
+
+    # One entry per remaining alliance, with its opponent's position
+    remaining = rows[rows["score"] < 0]
+    alliance_codes, alliances = pandas.factorize(
+        pandas.MultiIndex.from_arrays([remaining["key"],
+                                       remaining["alliance"]]))
+    alliances = pandas.MultiIndex.from_tuples(list(alliances),
+                                              names=["match", "alliance"])
+    membership = numpy.zeros((len(alliances), len(teams)))
+    membership[alliance_codes, teams.get_indexer(remaining["team_key"])] = 1
+    opponents = alliances.get_indexer(pandas.MultiIndex.from_arrays(
+        [alliances.get_level_values(0),
+         alliances.get_level_values(1).map({"red": "blue", "blue": "red"})]))
+
+    stats = ["score", "score_var"] + list(BONUS_COLUMNS.values())
+    qual = predictions.xs("qual", level="level")["value"]
+    qual = qual[qual.index.get_level_values("statistic").isin(stats)]
+    predicted = qual.astype(float).unstack("statistic").reindex(alliances)
+    if predicted[stats].isnull().any(axis=None) or (opponents < 0).any():
+        raise server.ArgumentError("Predictions are missing for some "
+                                   "unplayed matches.")
+    mean = predicted["score"].to_numpy()
+    std = numpy.sqrt(predicted["score_var"].to_numpy())
+    bonus_probs = predicted[list(BONUS_COLUMNS.values())].to_numpy()
+
+    rng = numpy.random.RandomState(seed)
+    num_teams = len(teams)
+    counts = numpy.zeros(num_teams * num_teams, dtype="int64")
+    done = 0
+    while done < num_sims:
+        size = min(batch_size, num_sims - done)
+        scores = mean + std * rng.standard_normal((size, len(alliances)))
+        opp_scores = scores[:, opponents]
+        alliance_rp = (WIN_POINTS * (scores > opp_scores) +
+                       TIE_POINTS * (scores == opp_scores) +
+                       (rng.random_sample((size,) + bonus_probs.shape) <
+                        bonus_probs).sum(axis=2))
+        team_rp = earned_rp.to_numpy() + alliance_rp @ membership
+        team_pts = earned_pts.to_numpy() + scores @ membership
+        # Sort by ranking points, then match points, both descending
+        order = numpy.lexsort((-team_pts, -team_rp), axis=1)
+        ranks = numpy.empty_like(order)
+        numpy.put_along_axis(ranks, order,
+                             numpy.arange(num_teams)[numpy.newaxis, :],
+                             axis=1)
+        counts += numpy.bincount(
+            (numpy.arange(num_teams) * num_teams + ranks).ravel(),
+            minlength=num_teams * num_teams)
+        done += size
+
+    probs = pandas.DataFrame(counts.reshape(num_teams, num_teams) / num_sims,
+                             index=pandas.Index(teams, name="team"),
+                             columns=numpy.arange(1, num_teams + 1))
+    mean_rank = probs.to_numpy() @ probs.columns.to_numpy()
+    return probs.iloc[numpy.argsort(mean_rank, kind="stable")]